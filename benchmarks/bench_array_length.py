@@ -0,0 +1,66 @@
+"""Regression benchmark for the time taken by the PLY engine to decode large
+arrays and maps.
+
+The pair_list and value_list rules are left recursive and append in place, so
+the time per element should stay about the same from 8k to 128k elements, and
+decoding must not depend on the depth of the Python stack.  Exits with status 1
+if either doesn't hold.
+
+    python benchmarks/bench_array_length.py
+"""
+import sys
+import time
+
+import compactdata
+
+SIZES = (8000, 16000, 32000, 64000, 128000)
+# allowed growth of the time per element from the smallest to the largest size
+MAX_GROWTH = 2.0
+# a stack this shallow fails at once if the parser recurses per element
+RECURSION_LIMIT = 200
+
+
+def best_time(compactdata_string, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compactdata.loads(compactdata_string, engine="ply")
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    failed = False
+    for kind, build in (
+        ("array", lambda n: "salts=[" + ";".join(f"id{i}" for i in range(n)) + "]"),
+        ("map", lambda n: "(" + ";".join(f"k{i}=v" for i in range(n)) + ")"),
+    ):
+        per_element = []
+        for n in SIZES:
+            elapsed = best_time(build(n))
+            per_element.append(elapsed / n)
+            print(f"{kind:5} n={n:>6}  {elapsed * 1e3:8.1f} ms  {elapsed / n * 1e6:6.2f} us/element")
+        growth = per_element[-1] / per_element[0]
+        print(f"{kind:5} time per element grew {growth:.2f}x from n={SIZES[0]} to n={SIZES[-1]}")
+        if growth > MAX_GROWTH:
+            print(f"FAIL: {kind} decoding is not linear (limit {MAX_GROWTH}x)")
+            failed = True
+
+    compactdata_string = "salts=[" + ";".join(f"id{i}" for i in range(SIZES[-1])) + "]"
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(RECURSION_LIMIT)
+    try:
+        result = compactdata.loads(compactdata_string, engine="ply")
+    except (RecursionError, compactdata.CompactDataDecodeError) as e:
+        print(f"FAIL: n={SIZES[-1]} with a recursion limit of {RECURSION_LIMIT}: {e!r}")
+        failed = True
+    else:
+        print(f"n={SIZES[-1]} decoded with a recursion limit of {RECURSION_LIMIT}: {len(result['salts'])} elements")
+    finally:
+        sys.setrecursionlimit(limit)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Microbenchmark of decode_string() for tokens with and without escapes.
+
+Tokens without a backslash or tilde skip the unescaping regex, so plain
+strings should decode several times faster than strings of the same length
+with escapes.  Exits with status 1 if they don't, or if a token decodes to
+the wrong value.
+
+    python benchmarks/bench_decode_string.py
+"""
+import sys
+import timeit
+
+from compactdata.unescapes import decode_string
+
+NUMBER = 300000
+# required speedup of plain strings over escaped strings of the same length
+MIN_SPEEDUP = 2.0
+
+TOKENS = (
+    ("plain", "example.com", "", "example.com"),
+    ("escaped", "a\\;b~(c.com", "", "a;b(c.com"),
+    ("quoted plain", "example.com", '"', "example.com"),
+    ("quoted escaped", 'a\\"b~"c.com', '"', 'a"b"c.com'),
+    ("number", "12345", "", 12345),
+    ("float", "12.5e3", "", 12500.0),
+)
+
+
+def tokens_per_second(token, quote_char):
+    best = min(timeit.repeat(lambda: decode_string(token, quote_char), number=NUMBER, repeat=3))
+    return NUMBER / best
+
+
+def main():
+    failed = False
+    rates = {}
+    for name, token, quote_char, expected in TOKENS:
+        result = decode_string(token, quote_char)
+        if result != expected or type(result) is not type(expected):
+            print(f"FAIL: {quote_char}{token}{quote_char} decoded to {result!r}, expected {expected!r}")
+            failed = True
+        rates[name] = tokens_per_second(token, quote_char)
+        print(f"{name:15} {quote_char + token + quote_char:14} {rates[name] / 1e6:6.2f}M tokens/s")
+    for plain, escaped in (("plain", "escaped"), ("quoted plain", "quoted escaped")):
+        speedup = rates[plain] / rates[escaped]
+        print(f"{plain} strings decode {speedup:.2f}x faster than {escaped} strings")
+        if speedup < MIN_SPEEDUP:
+            print(f"FAIL: {plain} strings don't skip unescaping (limit {MIN_SPEEDUP}x)")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
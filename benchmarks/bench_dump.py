@@ -0,0 +1,94 @@
+"""Benchmark of compactdata.dump() against fp.write(compactdata.dumps(obj)).
+
+dumps() holds the whole encoded document in memory, while dump() writes it to
+fp in pieces of buffer_size characters as it is encoded, so its peak memory
+use should stay about the same as the document grows.  Exits with status 1 if
+the output differs, or if a write is longer than buffer_size.
+
+    python benchmarks/bench_dump.py
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import compactdata
+
+SIZES = (10000, 40000)
+BUFFER_SIZE = io.DEFAULT_BUFFER_SIZE
+
+
+class RecordingFile(io.StringIO):
+    # Records the length of each write
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, s):
+        self.writes.append(len(s))
+        return super().write(s)
+
+
+def build(n):
+    return {
+        "@dv": 1,
+        "salts": [{"s": f"host{i}.example.com", "ids": [f"342c208d-0523-4d22-b7dd-{i:012d}", "x y"]} for i in range(n)],
+    }
+
+
+def measure(function, obj):
+    # Return the best time to write obj to a file on disk, and the peak memory
+    # allocated while doing so
+    best = None
+    fd, path = tempfile.mkstemp()
+    try:
+        with open(fd, "w", encoding="utf-8") as fp:
+            for _ in range(3):
+                fp.seek(0)
+                start = time.perf_counter()
+                function(obj, fp)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            fp.seek(0)
+            tracemalloc.start()
+            function(obj, fp)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        os.unlink(path)
+    return best, peak
+
+
+def main():
+    failed = False
+    for n in SIZES:
+        obj = build(n)
+        expected = compactdata.dumps(obj)
+        for name, function in (
+            ("fp.write(dumps(obj))", lambda obj, fp: fp.write(compactdata.dumps(obj))),
+            ("dump(obj, fp)", lambda obj, fp: compactdata.dump(obj, fp, buffer_size=BUFFER_SIZE)),
+        ):
+            recording = RecordingFile()
+            function(obj, recording)
+            if recording.getvalue() != expected:
+                print(f"FAIL: {name} wrote a different document")
+                failed = True
+            elapsed, peak = measure(function, obj)
+            print(
+                f"n={n:>6} {name:21} {elapsed * 1e3:8.1f} ms  peak {peak / 1e6:6.2f} MB  "
+                f"{len(recording.writes):>5} writes of at most {max(recording.writes)} chars"
+            )
+
+    # a single chunk much longer than the buffer
+    recording = RecordingFile()
+    compactdata.dump({"a": "x" * 5_000_000}, recording, buffer_size=BUFFER_SIZE)
+    if max(recording.writes) > BUFFER_SIZE:
+        print(f"FAIL: dump() wrote {max(recording.writes)} chars at once, with buffer_size={BUFFER_SIZE}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Benchmark of the time taken by ``import compactdata`` in a fresh interpreter.
+
+The median over several interpreters is reported, less the median startup
+time of an interpreter that imports nothing, followed by the modules, including
+those of the standard library, that take longest to import according to
+``python -X importtime``.  The PLY lexer and parser are created from the
+shipped tables on first use, not at import.  Exits with status 1 if the import
+creates them.
+
+    python benchmarks/bench_import.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 15
+SLOWEST = 8
+
+# run against the package in this checkout rather than an installed one
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (ROOT, os.environ.get("PYTHONPATH")))))
+
+CHECK_LAZY = """
+import time
+import compactdata
+from compactdata import decoder
+print(hasattr(decoder._thread_local, "lexers_and_parsers"))
+start = time.perf_counter()
+decoder.get_lexer_and_parser()
+print(time.perf_counter() - start)
+"""
+
+
+def run(*args):
+    return subprocess.run([sys.executable, *args], env=ENV, capture_output=True, text=True, check=True)
+
+
+def median_time(code):
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        run("-c", code)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    startup = median_time("pass")
+    total = median_time("import compactdata")
+    print(f"interpreter startup      {startup * 1e3:6.1f} ms")
+    print(f"import compactdata       {(total - startup) * 1e3:6.1f} ms (median of {RUNS})")
+
+    # -X importtime writes "import time: self [us] | cumulative | imported package" to stderr
+    modules = []
+    for line in run("-X", "importtime", "-c", "import compactdata").stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[0].split(":")[1].strip().isdigit():
+            modules.append((int(fields[0].split(":")[1]), int(fields[1]), fields[2].strip()))
+    print("slowest modules (self / cumulative, us):")
+    for self_time, cumulative, name in sorted(modules, reverse=True)[:SLOWEST]:
+        print(f"  {self_time:>7} {cumulative:>8}  {name}")
+
+    created, first_use = run("-c", CHECK_LAZY).stdout.split()
+    print(f"first PLY lexer and parser {float(first_use) * 1e3:6.1f} ms")
+    if created == "True":
+        print("FAIL: import compactdata created the PLY lexer and parser")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Benchmark of compactdata.parallel.loads_many() against the serial
+compactdata.loads_many(), with 1, 2 and 4 worker processes and one per CPU.
+
+The speedup over the serial decode is at most the number of CPUs, less the
+cost of starting the workers and pickling the records and results.  Exits with
+status 1 if any pool returns different results from the serial decode.
+
+    python benchmarks/bench_parallel.py
+"""
+import os
+import sys
+import time
+
+import compactdata
+from compactdata import parallel
+
+RECORDS = 50000
+CHUNKSIZE = 1000
+WORKERS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+def best_time(function, repeat=3):
+    best = result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    records = [
+        f"@dv=1;salts=[(s=host{i}.example.com;ids=[342c208d-0523-4d22-b7dd-{i:012d};`x y`]);"
+        f'(s="q;{i}";ids=[{i};{i}.5;true;null])];n={i}'
+        for i in range(RECORDS)
+    ]
+    print(f"{RECORDS} records, {os.cpu_count()} CPUs")
+    serial, expected = best_time(lambda: compactdata.loads_many(records))
+    print(f"serial     {serial * 1e3:8.1f} ms")
+    failed = False
+    for workers in WORKERS:
+        elapsed, result = best_time(lambda: parallel.loads_many(records, workers=workers, chunksize=CHUNKSIZE))
+        print(f"workers={workers:<3}{elapsed * 1e3:8.1f} ms  {serial / elapsed:5.2f}x serial")
+        if result != expected:
+            print(f"FAIL: the results with {workers} workers differ from the serial decode")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
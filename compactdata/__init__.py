@@ -1,11 +1,23 @@
+import io
 import logging
+import mmap
 
+from compactdata.decode_context import DecodeContext, default_binary_context, default_context
 from compactdata.decoder import create_parser, get_lexer_and_parser
 from compactdata.encoder import CompactDataEncoder
 from compactdata.exceptions import CompactDataDecodeError, CompactDataEncodeError
+from compactdata.extractor import build_path_tree
+from compactdata.extractor import extract as extract_paths
+from compactdata.incremental_decoder import CompactDataIncrementalDecoder
+from compactdata.lazy import LazyList, LazyMap
+from compactdata.lazy import resolve as resolve_lazy
+from compactdata.scanner import iterparse as scanner_iterparse
+from compactdata.scanner import parse as scanner_parse
 
 logger = logging.getLogger(__name__)
 
+engines = ("scanner", "ply")
+
 _default_encoder = CompactDataEncoder(
     skipkeys=False,
     ensure_ascii=True,
@@ -26,30 +38,246 @@ def tokenize(compactdata_string: str, debug: bool = False) -> list[str]:
     return token_list
 
 
-def loads(compactdata_string: str, debug: bool = False):
-    _, parser = get_lexer_and_parser(debug)
+def iterparse(compactdata_string_or_fp):
+    """Yield (event, value) tuples for a CompactData string or file without
+    building the decoded maps and arrays.
+
+    The events are ``start_map``, ``key``, ``value``, ``end_map``,
+    ``start_array`` and ``end_array``.
+    """
+    if hasattr(compactdata_string_or_fp, "read"):
+        compactdata_string_or_fp = compactdata_string_or_fp.read()
     try:
-        result = parser.parse(compactdata_string)
+        yield from scanner_iterparse(compactdata_string_or_fp)
     except Exception as e:
         raise CompactDataDecodeError("Error decoding Compact Data string") from e
-    return result
 
 
-def dumps(
-    obj,
+def _get_contexts(intern_keys, intern_values, memo, lazy, into, **hooks):
+    # Return the contexts for decoding a str and UTF-8 encoded bytes, which
+    # share the memo
+    has_hooks = any(hook is not None for hook in hooks.values())
+    if not intern_keys and not intern_values and memo is None and not lazy and not has_hooks:
+        contexts = default_context, default_binary_context
+    else:
+        if memo is None and (intern_keys or intern_values):
+            memo = {}
+        # a memo on its own interns keys
+        key_memo = memo if intern_keys or not intern_values else None
+        value_memo = memo if intern_values else None
+        contexts = (
+            DecodeContext(key_memo=key_memo, value_memo=value_memo, lazy=lazy, **hooks),
+            DecodeContext(key_memo=key_memo, value_memo=value_memo, lazy=lazy, binary=True, **hooks),
+        )
+    if into is None:
+        return contexts
+    if lazy:
+        raise ValueError("lazy can't be combined with into")
+    # imported here since it needs typing, decimal and dataclasses
+    from compactdata.schema import record_context
+
+    return record_context(into, contexts[0]), record_context(into, contexts[1])
+
+
+def _get_decoder(debug, engine, contexts, lazy):
+    # Return a function decoding a string or UTF-8 encoded bytes with the given
+    # options, which raises the underlying exceptions
+    if engine is None:
+        engine = "ply" if debug else "scanner"
+    if engine not in engines:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(engines)}")
+    context, binary_context = contexts
+    if engine == "ply" and context.field_contexts is not None:
+        raise ValueError("into is only supported by the scanner engine")
+    if engine == "scanner":
+
+        def decode(compactdata_string):
+            if isinstance(compactdata_string, str):
+                result = scanner_parse(compactdata_string, context)
+            else:
+                result = scanner_parse(compactdata_string, binary_context)
+            # a document that is a single scalar is returned undecoded
+            return resolve_lazy(result) if lazy else result
+
+        return decode
+
+    lexer, parser = get_lexer_and_parser(debug)
+
+    def decode(compactdata_string):
+        if not isinstance(compactdata_string, str):
+            compactdata_string = str(compactdata_string, "utf-8")
+        parser.context = context
+        try:
+            result = parser.parse(compactdata_string, lexer=lexer)
+        finally:
+            parser.context = default_context
+        return resolve_lazy(result) if lazy else result
+
+    return decode
+
+
+def loads(
+    compactdata_string,
+    debug: bool = False,
+    engine: str = None,
     *,
-    skipkeys=False,
-    ensure_ascii=True,
-    check_circular=True,
-    allow_nan=True,
-    cls=None,
-    indent=None,
-    default=None,
-    sort_keys=False,
-    escape_char="\\",
-    quote_char='"',
-    shortest=True,
-    dns_optimized=False,
+    intern_keys: bool = False,
+    intern_values: bool = False,
+    memo: dict = None,
+    lazy: bool = False,
+    into: type = None,
+    object_hook=None,
+    object_pairs_hook=None,
+    parse_int=None,
+    parse_float=None,
+    parse_constant=None,
+):
+    """Decode a CompactData string, or UTF-8 encoded bytes, bytearray or
+    memoryview, which are scanned without being decoded to a str first.
+
+    engine selects the decoding backend: ``"scanner"`` is the hand-written
+    single pass parser, ``"ply"`` is the PLY lexer/parser kept as the reference
+    implementation.  The default is ``"scanner"``, unless debug is true, since
+    only the PLY backend produces debug output.
+
+    If intern_keys is true, equal map keys share one string object, and if
+    intern_values is true so do equal string values, which saves memory when
+    decoding many maps with the same keys or values.  The strings are looked
+    up in memo, a dict that may be passed to share them between calls; passing
+    a memo on its own implies intern_keys.
+
+    If lazy is true, maps and arrays are decoded to read-only LazyMap and
+    LazyList objects, which only unescape strings and convert numbers when
+    they are read.  Syntax errors are still raised by loads(), but invalid
+    escape sequences are only found when the string containing them is read.
+    lazy can't be combined with intern_values.
+
+    If into is a dataclass or a class with ``__slots__``, a top level map, or
+    each map of a top level array, is decoded to an instance of it.  The
+    values of fields annotated with another such class, a list of one or
+    Optional of one are decoded to instances of it in turn, and values of
+    fields annotated as str, int, float or Decimal are built by that type
+    from the unescaped text, so an unquoted 007 stays "007" in a str field.
+    Keys that aren't fields are ignored.  Dataclasses are created by calling
+    the class, other classes by setting the attributes of an instance created
+    without calling ``__init__``.  into is only supported by the scanner
+    engine, and can't be combined with lazy.
+
+    object_hook, object_pairs_hook, parse_int, parse_float and parse_constant
+    are used as by ``json.loads()``, as each map or number is decoded:
+    object_pairs_hook is called with the list of pairs of each map, keeping
+    duplicate keys, object_hook with the dict, and parse_constant with the
+    unquoted strings Infinity, -Infinity and NaN, which are otherwise decoded
+    as strings.  Maps decoded by into don't go through the map hooks.  None of
+    the hooks can be combined with lazy.
+    """
+    contexts = _get_contexts(
+        intern_keys,
+        intern_values,
+        memo,
+        lazy,
+        into,
+        object_hook=object_hook,
+        object_pairs_hook=object_pairs_hook,
+        parse_int=parse_int,
+        parse_float=parse_float,
+        parse_constant=parse_constant,
+    )
+    decode = _get_decoder(debug, engine, contexts, lazy)
+    try:
+        return decode(compactdata_string)
+    except Exception as e:
+        raise CompactDataDecodeError("Error decoding Compact Data string") from e
+
+
+def loads_many(
+    compactdata_strings,
+    debug: bool = False,
+    engine: str = None,
+    *,
+    intern_keys: bool = False,
+    intern_values: bool = False,
+    memo: dict = None,
+    lazy: bool = False,
+    into: type = None,
+    object_hook=None,
+    object_pairs_hook=None,
+    parse_int=None,
+    parse_float=None,
+    parse_constant=None,
+    return_exceptions: bool = False,
+) -> list:
+    """Decode each of an iterable of CompactData strings or bytes.
+
+    The options are those of loads(), and are only checked once for the whole
+    batch.  A memo created for intern_keys or intern_values is shared by all
+    of the strings.
+
+    Return the list of decoded objects.  If a string can't be decoded, a
+    CompactDataDecodeError giving its index is raised, unless
+    return_exceptions is true, in which case the exception is put in the list
+    in place of the object and decoding continues.
+    """
+    contexts = _get_contexts(
+        intern_keys,
+        intern_values,
+        memo,
+        lazy,
+        into,
+        object_hook=object_hook,
+        object_pairs_hook=object_pairs_hook,
+        parse_int=parse_int,
+        parse_float=parse_float,
+        parse_constant=parse_constant,
+    )
+    decode = _get_decoder(debug, engine, contexts, lazy)
+    results = []
+    append = results.append
+    for index, compactdata_string in enumerate(compactdata_strings):
+        try:
+            append(decode(compactdata_string))
+        except Exception as e:
+            error = CompactDataDecodeError(f"Error decoding Compact Data string at index {index}")
+            error.__cause__ = e
+            if not return_exceptions:
+                raise error
+            append(error)
+    return results
+
+
+def extract(compactdata_string: str, paths):
+    """Decode only the values at the given paths of a CompactData string.
+
+    A path is a sequence of map keys separated by dots, each optionally
+    followed by array subscripts: ``[*]`` for every element or ``[n]`` for a
+    single element, e.g. ``salts[*].ids[0]``.
+
+    Return a dict mapping each path that was found to its value, or for paths
+    with a ``[*]`` subscript to the list of matching values.  Maps and arrays
+    that no path leads into are skipped by matching their brackets, so they
+    are not checked for syntax errors and none of their strings are unescaped
+    or converted to numbers.
+    """
+    path_tree = build_path_tree(paths)
+    try:
+        return extract_paths(compactdata_string, path_tree)
+    except Exception as e:
+        raise CompactDataDecodeError("Error decoding Compact Data string") from e
+
+
+def _get_encoder(
+    skipkeys,
+    ensure_ascii,
+    check_circular,
+    allow_nan,
+    cls,
+    indent,
+    default,
+    sort_keys,
+    escape_char,
+    quote_char,
+    shortest,
+    dns_optimized,
 ):
     if (
         not skipkeys
@@ -66,7 +294,7 @@ def dumps(
         and not dns_optimized
     ):
         # use cached encoder
-        return _default_encoder.encode(obj)
+        return _default_encoder
     if cls is None:
         cls = CompactDataEncoder
     return cls(
@@ -81,11 +309,179 @@ def dumps(
         quote_char=quote_char,
         shortest=shortest,
         dns_optimized=dns_optimized,
+    )
+
+
+def dumps(
+    obj,
+    *,
+    skipkeys=False,
+    ensure_ascii=True,
+    check_circular=True,
+    allow_nan=True,
+    cls=None,
+    indent=None,
+    default=None,
+    sort_keys=False,
+    escape_char="\\",
+    quote_char='"',
+    shortest=True,
+    dns_optimized=False,
+    as_bytes=False,
+):
+    """Serialize obj to a CompactData string, or to UTF-8 encoded bytes if
+    as_bytes is true.
+    """
+    result = _get_encoder(
+        skipkeys,
+        ensure_ascii,
+        check_circular,
+        allow_nan,
+        cls,
+        indent,
+        default,
+        sort_keys,
+        escape_char,
+        quote_char,
+        shortest,
+        dns_optimized,
     ).encode(obj)
+    return result.encode("utf-8") if as_bytes else result
+
+
+def dumps_many(
+    objs,
+    *,
+    skipkeys=False,
+    ensure_ascii=True,
+    check_circular=True,
+    allow_nan=True,
+    cls=None,
+    indent=None,
+    default=None,
+    sort_keys=False,
+    escape_char="\\",
+    quote_char='"',
+    shortest=True,
+    dns_optimized=False,
+    as_bytes=False,
+    return_exceptions=False,
+) -> list:
+    """Serialize each of an iterable of objects with one encoder.
 
+    The options are those of dumps().  Return the list of encoded strings.  If
+    an object can't be encoded, a CompactDataEncodeError giving its index is
+    raised, unless return_exceptions is true, in which case the exception is
+    put in the list in place of the string and encoding continues.
+    """
+    encode = _get_encoder(
+        skipkeys,
+        ensure_ascii,
+        check_circular,
+        allow_nan,
+        cls,
+        indent,
+        default,
+        sort_keys,
+        escape_char,
+        quote_char,
+        shortest,
+        dns_optimized,
+    ).encode
+    results = []
+    append = results.append
+    for index, obj in enumerate(objs):
+        try:
+            append(encode(obj).encode("utf-8") if as_bytes else encode(obj))
+        except Exception as e:
+            error = CompactDataEncodeError(f"Error encoding object at index {index}")
+            error.__cause__ = e
+            if not return_exceptions:
+                raise error
+            append(error)
+    return results
+
+
+def load(
+    fp,
+    debug: bool = False,
+    engine: str = None,
+    *,
+    intern_keys: bool = False,
+    intern_values: bool = False,
+    memo: dict = None,
+    lazy: bool = False,
+    into: type = None,
+    object_hook=None,
+    object_pairs_hook=None,
+    parse_int=None,
+    parse_float=None,
+    parse_constant=None,
+):
+    return loads(
+        fp.read(),
+        debug,
+        engine,
+        intern_keys=intern_keys,
+        intern_values=intern_values,
+        memo=memo,
+        lazy=lazy,
+        into=into,
+        object_hook=object_hook,
+        object_pairs_hook=object_pairs_hook,
+        parse_int=parse_int,
+        parse_float=parse_float,
+        parse_constant=parse_constant,
+    )
+
+
+def load_path(
+    path,
+    *,
+    intern_keys: bool = False,
+    intern_values: bool = False,
+    memo: dict = None,
+    lazy: bool = False,
+    into: type = None,
+    object_hook=None,
+    object_pairs_hook=None,
+    parse_int=None,
+    parse_float=None,
+    parse_constant=None,
+):
+    """Decode the UTF-8 encoded CompactData file at path.
 
-def load(fp, debug: bool = False):
-    return loads(fp.read(), debug)
+    The file is memory mapped and scanned as bytes, and only the strings in
+    it are decoded, one token at a time, so the whole file is never held in
+    memory as a str.  The options are those of loads(); the scanner engine is
+    always used.
+    """
+    contexts = _get_contexts(
+        intern_keys,
+        intern_values,
+        memo,
+        lazy,
+        into,
+        object_hook=object_hook,
+        object_pairs_hook=object_pairs_hook,
+        parse_int=parse_int,
+        parse_float=parse_float,
+        parse_constant=parse_constant,
+    )
+    decode = _get_decoder(False, "scanner", contexts, lazy)
+    with open(path, "rb") as fp:
+        try:
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            buffer = b""
+        try:
+            return decode(buffer)
+        except Exception as e:
+            raise CompactDataDecodeError("Error decoding Compact Data string") from e
+        finally:
+            if buffer:
+                buffer.close()
 
 
 def dump(
@@ -104,20 +500,47 @@ def dump(
     quote_char='"',
     shortest=True,
     dns_optimized=False,
+    buffer_size=io.DEFAULT_BUFFER_SIZE,
 ):
-    for chunk in dumps(
-        obj,
-        skipkeys=skipkeys,
-        ensure_ascii=ensure_ascii,
-        check_circular=check_circular,
-        allow_nan=allow_nan,
-        cls=cls,
-        indent=indent,
-        default=default,
-        sort_keys=sort_keys,
-        escape_char=escape_char,
-        quote_char=quote_char,
-        shortest=shortest,
-        dns_optimized=dns_optimized,
-    ):
-        fp.write(chunk)
+    """Serialize obj to the file-like object fp as it is encoded.
+
+    The chunks produced by the encoder are collected and written in pieces of
+    buffer_size characters, with one ``fp.write()`` call each, followed by the
+    rest at the end.  If buffer_size is None or 0 every chunk is written as
+    soon as it is produced.
+    """
+    iterable = _get_encoder(
+        skipkeys,
+        ensure_ascii,
+        check_circular,
+        allow_nan,
+        cls,
+        indent,
+        default,
+        sort_keys,
+        escape_char,
+        quote_char,
+        shortest,
+        dns_optimized,
+    ).iterencode(obj)
+    if not buffer_size:
+        for chunk in iterable:
+            fp.write(chunk)
+        return
+    buffer = []
+    buffered = 0
+    for chunk in iterable:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= buffer_size:
+            # a chunk may be longer than buffer_size, such as a long string
+            data = "".join(buffer)
+            end = buffered - buffered % buffer_size
+            for start in range(0, end, buffer_size):
+                fp.write(data[start : start + buffer_size])
+            buffer.clear()
+            buffered -= end
+            if buffered:
+                buffer.append(data[end:])
+    if buffer:
+        fp.write("".join(buffer))
@@ -0,0 +1,126 @@
+import asyncio
+import codecs
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from compactdata import _get_encoder
+from compactdata.exceptions import CompactDataDecodeError
+from compactdata.incremental_decoder import CompactDataIncrementalDecoder
+
+# Decoding and encoding on asyncio streams.  The work is done a buffer at a
+# time, handing control back to the event loop in between, or in an executor
+# if one is given, so a large document doesn't block the loop.  The executor
+# has to be a ThreadPoolExecutor, since the decoder and the chunks of the
+# encoder are stateful and can't be sent to another process.
+
+
+def _check_executor(executor):
+    if executor is not None and not isinstance(executor, ThreadPoolExecutor):
+        raise TypeError(f"executor must be a ThreadPoolExecutor, not {type(executor).__name__}")
+
+
+async def _run(executor, function, *args):
+    if executor is None:
+        result = function(*args)
+        # let other tasks run between buffers
+        await asyncio.sleep(0)
+        return result
+    return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+
+def _assemble(first_char, items):
+    # Join the top level elements returned by an incremental decoder
+    if first_char == "[":
+        return items
+    if first_char != "(" and len(items) == 1 and not isinstance(items[0], tuple):
+        # a document with a single value
+        return items[0]
+    return dict(items)
+
+
+async def load_async(reader, *, buffer_size: int = 1 << 16, executor=None):
+    """Decode the UTF-8 encoded CompactData document read from an
+    ``asyncio.StreamReader`` until EOF.
+
+    The document is decoded with a CompactDataIncrementalDecoder as it is
+    read, buffer_size bytes at a time, in executor if one is given, which
+    must be a ThreadPoolExecutor.
+    """
+    _check_executor(executor)
+    utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+    decoder = CompactDataIncrementalDecoder()
+    items = []
+    first_char = None
+    while True:
+        data = await reader.read(buffer_size)
+        try:
+            text = utf8_decoder.decode(data, final=not data)
+        except UnicodeDecodeError as e:
+            raise CompactDataDecodeError("Error decoding Compact Data string") from e
+        if first_char is None and text.strip(" \t\n"):
+            first_char = text.lstrip(" \t\n")[0]
+        items.extend(await _run(executor, decoder.feed, text))
+        if not data:
+            items.extend(await _run(executor, decoder.close))
+            return _assemble(first_char, items)
+
+
+def _next_block(chunks, buffer_size):
+    block = []
+    size = 0
+    for chunk in chunks:
+        block.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            break
+    return "".join(block)
+
+
+async def dump_async(
+    obj,
+    writer,
+    *,
+    skipkeys=False,
+    ensure_ascii=True,
+    check_circular=True,
+    allow_nan=True,
+    cls=None,
+    indent=None,
+    default=None,
+    sort_keys=False,
+    escape_char="\\",
+    quote_char='"',
+    shortest=True,
+    dns_optimized=False,
+    buffer_size=io.DEFAULT_BUFFER_SIZE,
+    executor=None,
+):
+    """Serialize obj as UTF-8 to an ``asyncio.StreamWriter``.
+
+    The output of ``iterencode()`` is encoded about buffer_size characters at
+    a time, in executor if one is given, and each block is written and
+    drained before the next one is encoded, so a slow reader holds back the
+    encoding rather than letting the output pile up in memory.  executor
+    must be a ThreadPoolExecutor, as for load_async().
+    """
+    _check_executor(executor)
+    chunks = _get_encoder(
+        skipkeys,
+        ensure_ascii,
+        check_circular,
+        allow_nan,
+        cls,
+        indent,
+        default,
+        sort_keys,
+        escape_char,
+        quote_char,
+        shortest,
+        dns_optimized,
+    ).iterencode(obj)
+    while True:
+        block = await _run(executor, _next_block, chunks, buffer_size)
+        if not block:
+            return
+        writer.write(block.encode("utf-8"))
+        await writer.drain()
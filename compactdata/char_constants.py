@@ -35,7 +35,11 @@ quote_chars = [quotation_mark, grave_accent, empty_string]
 escape_chars_regex = f"\\{reverse_solidus}{tilde}"  # reverse solidus has to be escaped
 control_chars_regex = r"\x00-\x1f"  # control characters U+0000 to U+001F
 unicode_escape_regex = r"u[0-9a-fA-F]{4}"
+number_first_chars = "-0123456789"
 number_regex = re.compile(r"^(-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)$")
+# The same numbers as number_regex, with the fraction and exponent captured so
+# that a match tells an int from a float
+float_parts_regex = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
 all_escaped_chars_regex = re.compile(f"[{escape_chars_regex}](.|{unicode_escape_regex})")
 
 # A mapping of unescaped characters to their escaped equivalents
@@ -62,6 +66,30 @@ for i in range(0x20):
 
 escaped_to_unescaped_map = {v: k for k, v in unescaped_to_escaped_map.items()}
 
+# The regexes match strings that can be encoded as unquoted strings without
+# escaping anything.  Strings that look like numbers still have to be quoted.
+_unsafe_unquoted_chars = (
+    f"{control_chars_regex}"
+    f"{escape_chars_regex}"
+    f"{quotation_mark}"
+    f"{grave_accent}"
+    f"{unquoted_string_reserved_chars}"
+)
+unquoted_safe_regex = re.compile(
+    f"[^ {_unsafe_unquoted_chars}]"
+    f"(?:[^{_unsafe_unquoted_chars}]*[^ {_unsafe_unquoted_chars}])?"  # no leading or trailing space
+)
+# The ASCII variant lists the safe characters, since a negated class excluding
+# everything above \x7e is slow to compile
+_unsafe_unquoted_regex = re.compile(f"[{_unsafe_unquoted_chars}]")
+_safe_unquoted_chars_ascii = "".join(
+    re.escape(char) for char in map(chr, range(0x21, 0x7F)) if not _unsafe_unquoted_regex.match(char)
+)
+unquoted_safe_regex_ascii = re.compile(
+    f"[{_safe_unquoted_chars_ascii}]"
+    f"(?:[ {_safe_unquoted_chars_ascii}]*[{_safe_unquoted_chars_ascii}])?"  # no leading or trailing space
+)
+
 # The regexes are used to check if a string contains characters that need to be escaped
 _chars_to_escape = {
     quotation_mark: re.compile(
@@ -0,0 +1,111 @@
+from compactdata.lazy import LazyList, LazyMap, raw_scalar
+from compactdata.tokenizer import next_token, next_token_bytes
+from compactdata.unescapes import decode_string, make_string_decoder
+
+
+def _make_interning_decoder(memo, _decode_string=decode_string):
+    setdefault = memo.setdefault
+
+    def _decode_interned(value, quote_char):
+        result = _decode_string(value, quote_char)
+        if result.__class__ is str:
+            return setdefault(result, result)
+        return result
+
+    return _decode_interned
+
+
+class _PairList(list):
+    # The pairs of a map for object_pairs_hook, which the scanner stores with
+    # result[key] = value
+    __slots__ = ()
+
+    def __setitem__(self, key, value):
+        self.append((key, value))
+
+
+def _make_pairs_hook(object_pairs_hook):
+    def pairs_hook(pairs):
+        return object_pairs_hook(list(pairs))
+
+    return pairs_hook
+
+
+class DecodeContext:
+    """The options that change the objects built while decoding, shared by the
+    scanner and the PLY grammar rules.
+
+    ``key_memo`` is a dict used to reuse one string object for equal keys, or
+    None to keep each key as it was read.  ``decode_string`` converts a
+    scalar token to its value, reusing equal strings from ``value_memo`` when
+    one is given.  A memo may be shared between calls.  ``map_hook`` and
+    ``array_hook``, unless None, are called with each decoded dict and list,
+    and their results are used instead.  ``field_contexts``, unless None,
+    maps keys to the contexts used for their values, other values being
+    decoded with ``base_context``.  ``map_class`` is the class of the object
+    the pairs of a map are stored in before map_hook is called.
+
+    ``object_hook``, ``object_pairs_hook``, ``parse_int``, ``parse_float``
+    and ``parse_constant`` are the hooks of ``loads()``.
+
+    If ``lazy`` is true, scalars are kept undecoded in LazyMap and LazyList
+    containers, which decode them when they are read.  If ``binary`` is true
+    the input is UTF-8 encoded bytes rather than a string.
+    """
+
+    __slots__ = (
+        "key_memo",
+        "decode_string",
+        "map_hook",
+        "array_hook",
+        "next_token",
+        "field_contexts",
+        "base_context",
+        "map_class",
+    )
+
+    def __init__(
+        self,
+        key_memo=None,
+        value_memo=None,
+        lazy=False,
+        binary=False,
+        object_hook=None,
+        object_pairs_hook=None,
+        parse_int=None,
+        parse_float=None,
+        parse_constant=None,
+    ):
+        self.key_memo = key_memo
+        self.next_token = next_token_bytes if binary else next_token
+        self.map_hook = self.array_hook = None
+        self.field_contexts = None
+        self.base_context = self
+        self.map_class = dict
+        if parse_int is None and parse_float is None and parse_constant is None:
+            _decode_string = decode_string
+        else:
+            _decode_string = make_string_decoder(parse_int, parse_float, parse_constant)
+        if lazy:
+            if value_memo is not None:
+                raise ValueError("Values can't be interned when decoding lazily")
+            if _decode_string is not decode_string or object_hook is not None or object_pairs_hook is not None:
+                raise ValueError("Hooks can't be used when decoding lazily")
+            self.decode_string = raw_scalar
+            self.map_hook = LazyMap
+            self.array_hook = LazyList
+            return
+        if value_memo is None:
+            self.decode_string = _decode_string
+        else:
+            self.decode_string = _make_interning_decoder(value_memo, _decode_string)
+        if object_pairs_hook is not None:
+            # as in json, object_pairs_hook takes priority over object_hook
+            self.map_class = _PairList
+            self.map_hook = _make_pairs_hook(object_pairs_hook)
+        elif object_hook is not None:
+            self.map_hook = object_hook
+
+
+default_context = DecodeContext()
+default_binary_context = DecodeContext(binary=True)
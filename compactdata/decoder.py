@@ -1,25 +1,50 @@
 import logging
+import os
+import threading
 
 from ply import lex as lex
 from ply import yacc as yacc
 
+from compactdata.decode_context import default_context
 from compactdata.grammar_rules import *  # noqa
 from compactdata.token_definitions import *  # noqa
 
 logger = logging.getLogger(__name__)
 
+# The lexer and parser are created on first use from the precomputed tables in
+# lextab.py and parsetab.py, so creating them neither analyses the grammar nor
+# writes any files. Call write_tables() after changing token_definitions.py or
+# grammar_rules.py.
+
 
 def create_parser(debug: bool = False):
-    lexer = lex.lex(debug=debug, debuglog=logger)
-    parser = yacc.yacc(debug=debug, debuglog=logger)
+    if debug:
+        lexer = lex.lex(debug=True, debuglog=logger)
+    else:
+        lexer = lex.lex(optimize=True, lextab="lextab")
+    parser = yacc.yacc(debug=debug, debuglog=logger, write_tables=False)
+    parser.context = default_context
     return lexer, parser
 
 
-_lexer, _parser = create_parser(debug=False)
-_debug_lexer, _debug_parser = create_parser(debug=True)
+def write_tables():
+    outputdir = os.path.dirname(__file__)
+    lex.lex(debuglog=logger).writetab("lextab", outputdir)
+    yacc.yacc(debuglog=logger, outputdir=outputdir)
+
+
+# PLY lexers and parsers keep the state of the input being parsed, so each
+# thread gets its own pair.
+_thread_local = threading.local()
 
 
 def get_lexer_and_parser(debug: bool = False):
-    if debug:
-        return _debug_lexer, _debug_parser
-    return _lexer, _parser
+    try:
+        lexers_and_parsers = _thread_local.lexers_and_parsers
+    except AttributeError:
+        lexers_and_parsers = _thread_local.lexers_and_parsers = {}
+    try:
+        return lexers_and_parsers[debug]
+    except KeyError:
+        lexer_and_parser = lexers_and_parsers[debug] = create_parser(debug)
+        return lexer_and_parser
@@ -1,7 +1,20 @@
+import functools
+from collections import namedtuple
+from collections.abc import Iterator, Mapping, MappingView, Sequence, Set
+from operator import attrgetter, itemgetter
+
+from compactdata.char_constants import (
+    number_first_chars,
+    number_regex,
+    unquoted_safe_regex,
+    unquoted_safe_regex_ascii,
+)
 from compactdata.escapes import encode_basestring, encode_basestring_ascii
 
 INFINITY = float("inf")
 
+StringCacheInfo = namedtuple("StringCacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
 
 class CompactDataEncoder:
     """Extensible CompactData <https://compactdata.org> encoder for Python data structures.
@@ -11,9 +24,12 @@ class CompactDataEncoder:
     +-------------------+---------------+
     | Python            | CompactData          |
     +===================+===============+
-    | dict              | object        |
+    | dict, Mapping     | object        |
     +-------------------+---------------+
-    | list, tuple       | array         |
+    | list, tuple,      | array         |
+    | Sequence, Set,    |               |
+    | MappingView,      |               |
+    | Iterator          |               |
     +-------------------+---------------+
     | str               | string        |
     +-------------------+---------------+
@@ -26,6 +42,11 @@ class CompactDataEncoder:
     | None              | null          |
     +-------------------+---------------+
 
+    Iterators such as generators are encoded as they are iterated, without
+    being copied to a list, so ``iterencode()`` can stream an array of rows
+    read from a cursor.  bytes, bytearray and memoryview objects are not
+    encoded as arrays, and other iterables are passed to ``.default()``.
+
     To extend this to recognize other objects, subclass and implement a
     ``.default()`` method with another method that returns a serializable
     object for ``o`` if possible, otherwise it should call the superclass
@@ -47,6 +68,7 @@ class CompactDataEncoder:
         quote_char='"',
         shortest=True,
         dns_optimized=False,
+        string_cache_size=0,
     ):
         """Constructor for CompactDataEncoder, with sensible defaults.
 
@@ -94,6 +116,12 @@ class CompactDataEncoder:
         If dns_optimized is true, then the output will be optimized for DNS
         TXT records.  Overrides shortest to ``True``, ensure_ascii to ``True``,
         and escape_char to ``~``.  The default is ``False``.
+
+        If string_cache_size is a positive integer, the encoded forms of up to
+        that many of the most recently used strings are kept, so that keys and
+        values that occur many times are only escaped once.  Each instance has
+        its own cache, see ``string_cache_info()``.  The default is ``0``,
+        which disables the cache.
         """
 
         self.skipkeys = skipkeys
@@ -113,27 +141,121 @@ class CompactDataEncoder:
             self.escape_char = "~"
             self.indent = None
             self.ensure_ascii = True
+        self.string_cache_size = string_cache_size
+        # One cache for each combination of the settings that change how
+        # strings are encoded
+        self._string_caches = {}
+        # The field names of the classes passed to register(), and the plans
+        # compiled from them for each combination of settings
+        self._records = {}
+        self._record_plans = {}
 
     def default(self, obj):
         """Implement this method in a subclass such that it returns
         a serializable object for ``o``, or calls the base implementation
         (to raise a ``TypeError``).
 
-        For example, to support arbitrary iterators, you could
-        implement default like this::
+        For example, to support dates, you could implement default like
+        this::
 
             def default(self, o):
-                try:
-                    iterable = iter(o)
-                except TypeError:
-                    pass
-                else:
-                    return list(iterable)
+                if isinstance(o, datetime.date):
+                    return o.isoformat()
                 # Let the base class default method raise the TypeError
                 return CompactDataEncoder.default(self, o)
         """
         raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
 
+    def string_cache_info(self):
+        """Return the hits, misses, maxsize and current size of the string
+        cache as a ``StringCacheInfo`` named tuple."""
+        infos = [cache.cache_info() for cache in self._string_caches.values()]
+        return StringCacheInfo(
+            sum(info.hits for info in infos),
+            sum(info.misses for info in infos),
+            self.string_cache_size,
+            sum(info.currsize for info in infos),
+        )
+
+    def register(self, cls):
+        """Register a dataclass, ``typing.NamedTuple`` or ``typing.TypedDict``
+        class, and return it, so that it can be used as a class decorator.
+
+        Instances of registered dataclasses and named tuples are encoded as
+        maps of their fields, in the order the fields are defined, with the
+        keys escaped only once and each value encoded by a lookup on its type
+        instead of the generic checks.  TypedDict instances are plain dicts,
+        so for those only the keys are escaped in advance.
+        """
+        # imported here to keep it out of the import of compactdata
+        import dataclasses
+
+        if dataclasses.is_dataclass(cls) and isinstance(cls, type):
+            names = tuple(field.name for field in dataclasses.fields(cls))
+        elif issubclass(cls, tuple) and hasattr(cls, "_fields"):
+            names = tuple(cls._fields)
+        elif issubclass(cls, dict) and hasattr(cls, "__total__"):
+            names = tuple(cls.__annotations__)
+        else:
+            raise TypeError(f"{cls.__name__} is not a dataclass, NamedTuple or TypedDict")
+        self._records[cls] = names
+        self._record_plans.clear()
+        return cls
+
+    def _get_record_plans(self, _encode_str):
+        # Return the plans for the registered dataclasses and named tuples,
+        # mapping each class to the names of its fields, a function returning
+        # the values of the fields and the encoded keys, and a dict of the
+        # encoded keys of registered TypedDicts
+        key = (self.ensure_ascii, self.escape_char, self.quote_char, self.shortest, self.sort_keys)
+        try:
+            return self._record_plans[key]
+        except KeyError:
+            pass
+        plans = {}
+        encoded_keys = {}
+        for cls, names in self._records.items():
+            if issubclass(cls, dict):
+                for name in names:
+                    encoded_keys[name] = _encode_str(name)
+                continue
+            order = sorted(range(len(names)), key=names.__getitem__) if self.sort_keys else range(len(names))
+            ordered_names = tuple(names[i] for i in order)
+            if not names:
+                get_values = _no_values
+            elif issubclass(cls, tuple):
+                get_values = itemgetter(*order)
+            else:
+                get_values = attrgetter(*ordered_names)
+            if len(names) == 1:
+                # the getters only return a tuple for several items
+                get_values = _single_value_getter(get_values)
+            plans[cls] = (ordered_names, get_values, tuple(_encode_str(name) for name in ordered_names))
+        self._record_plans[key] = plans, encoded_keys
+        return plans, encoded_keys
+
+    def _get_string_encoder(self):
+        if self.ensure_ascii:
+            _encoder = encode_basestring_ascii
+            _unquoted_safe_regex = unquoted_safe_regex_ascii
+        else:
+            _encoder = encode_basestring
+            _unquoted_safe_regex = unquoted_safe_regex
+        if not self.string_cache_size:
+            return _make_string_encoder(
+                _encoder, _unquoted_safe_regex, self.escape_char, self.quote_char, self.shortest
+            )
+        key = (self.ensure_ascii, self.escape_char, self.quote_char, self.shortest, self.string_cache_size)
+        try:
+            return self._string_caches[key]
+        except KeyError:
+            string_encoder = _make_string_encoder(
+                _encoder, _unquoted_safe_regex, self.escape_char, self.quote_char, self.shortest
+            )
+            string_encoder = functools.lru_cache(maxsize=self.string_cache_size)(string_encoder)
+            self._string_caches[key] = string_encoder
+            return string_encoder
+
     def encode(self, o):
         """Return a CompactData string representation of a Python data structure.
 
@@ -194,6 +316,11 @@ class CompactDataEncoder:
 
             return text
 
+        _encode_str = self._get_string_encoder()
+        if self._records:
+            plans, encoded_keys = self._get_record_plans(_encode_str)
+        else:
+            plans = encoded_keys = None
         _iterencode = _make_iterencode(
             markers,
             self.default,
@@ -206,10 +333,49 @@ class CompactDataEncoder:
             self.quote_char,
             self.shortest,
             self.dns_optimized,
+            _encode_str,
+            plans,
+            encoded_keys,
         )
         return _iterencode(o, 0)
 
 
+def _is_container(o):
+    # Whether o is encoded as a map or an array
+    return isinstance(o, (Mapping, Iterator, Sequence, Set, MappingView)) and not isinstance(
+        o, (str, bytes, bytearray, memoryview)
+    )
+
+
+def _no_values(o):
+    return ()
+
+
+def _single_value_getter(getter):
+    def get_values(o):
+        return (getter(o),)
+
+    return get_values
+
+
+def _make_string_encoder(_encoder, _unquoted_safe_regex, _escape_char, _quote_char, _shortest):
+    if _shortest or _quote_char == "":
+        _unquoted_safe = _unquoted_safe_regex.fullmatch
+
+        def _encode_str(s):
+            # Most strings need no escaping, and are encoded as they are
+            if _unquoted_safe(s) and (s[0] not in number_first_chars or not number_regex.fullmatch(s)):
+                return s
+            return _encoder(s, _escape_char, _quote_char, _shortest)
+
+    else:
+
+        def _encode_str(s):
+            return _encoder(s, _escape_char, _quote_char, _shortest)
+
+    return _encode_str
+
+
 def _make_iterencode(
     markers,
     _default,
@@ -222,17 +388,34 @@ def _make_iterencode(
     _quote_char,
     _shortest,
     _dns_optimized,
+    _encode_str,
+    _plans=None,
+    _encoded_keys=None,
 ):
     _intstr = int.__repr__
     _key_separator = "="
     _item_separator = ";"
     if _indent is not None and not isinstance(_indent, str):
         _indent = " " * _indent
+    if _encoded_keys:
+
+        def _encode_key(key):
+            encoded = _encoded_keys.get(key)
+            return _encode_str(key) if encoded is None else encoded
+
+    else:
+        _encode_key = _encode_str
+    # The scalars that a registered record is most likely to hold, by class.
+    # Subclasses such as IntEnum go through the generic checks.
+    _scalar_encoders = {
+        str: _encode_str,
+        int: _intstr,
+        float: _floatstr,
+        bool: lambda value: "true" if value else "false",
+        type(None): lambda value: "null",
+    }
 
     def _iterencode_list(lst, _current_indent_level):
-        if not lst:
-            yield "[]"
-            return
         if markers is not None:
             marker_id = id(lst)
             if marker_id in markers:
@@ -254,7 +437,7 @@ def _make_iterencode(
             else:
                 buf = separator
             if isinstance(value, str):
-                yield buf + _encoder(value, _escape_char, _quote_char, _shortest)
+                yield buf + _encode_str(value)
             elif value is None:
                 yield buf + "null"
             elif value is True:
@@ -271,17 +454,23 @@ def _make_iterencode(
                 yield buf + _floatstr(value)
             else:
                 yield buf
-                if isinstance(value, (list, tuple)):
+                if _plans and value.__class__ in _plans:
+                    chunks = _iterencode_record(value, _current_indent_level, can_be_orphan_pair=True)
+                elif isinstance(value, (list, tuple)):
                     chunks = _iterencode_list(value, _current_indent_level)
-                elif isinstance(value, dict):
+                elif isinstance(value, (dict, Mapping)):
                     chunks = _iterencode_dict(value, _current_indent_level, can_be_orphan_pair=True)
                 else:
                     chunks = _iterencode(value, _current_indent_level)
                 yield from chunks
-        if newline_indent is not None:
-            _current_indent_level -= 1
-            yield "\n" + _indent * _current_indent_level
-        yield "]"
+        if first:
+            # an iterable can only be found to be empty by iterating it
+            yield "[]"
+        else:
+            if newline_indent is not None:
+                _current_indent_level -= 1
+                yield "\n" + _indent * _current_indent_level
+            yield "]"
         if markers is not None:
             del markers[marker_id]
 
@@ -333,29 +522,32 @@ def _make_iterencode(
                 first = False
             else:
                 yield item_separator
-            yield _encoder(key, _escape_char, _quote_char, _shortest)
-            if not isinstance(value, (list, tuple, dict)):
-                yield _key_separator
+            yield _encode_key(key)
             if isinstance(value, str):
-                yield _encoder(value, _escape_char, _quote_char, _shortest)
+                yield _key_separator + _encode_str(value)
             elif value is None:
-                yield "null"
+                yield "=null"
             elif value is True:
-                yield "true"
+                yield "=true"
             elif value is False:
-                yield "false"
+                yield "=false"
             elif isinstance(value, int):
                 # see comment for int/float in _make_iterencode
-                yield _intstr(value)
+                yield _key_separator + _intstr(value)
             elif isinstance(value, float):
                 # see comment for int/float in _make_iterencode
-                yield _floatstr(value)
+                yield _key_separator + _floatstr(value)
             else:
-                if isinstance(value, (list, tuple)):
+                # a map or an array follows the key without a separator
+                if _plans and value.__class__ in _plans:
+                    chunks = _iterencode_record(value, _current_indent_level)
+                elif isinstance(value, (list, tuple)):
                     chunks = _iterencode_list(value, _current_indent_level)
                 elif isinstance(value, dict):
                     chunks = _iterencode_dict(value, _current_indent_level)
                 else:
+                    if not _is_container(value):
+                        yield _key_separator
                     chunks = _iterencode(value, _current_indent_level)
                 yield from chunks
         if newline_indent is not None:
@@ -368,7 +560,7 @@ def _make_iterencode(
 
     def _iterencode(o, _current_indent_level):
         if isinstance(o, str):
-            yield _encoder(o, _escape_char, _quote_char, _shortest)
+            yield _encode_str(o)
         elif o is None:
             yield "null"
         elif o is True:
@@ -381,10 +573,14 @@ def _make_iterencode(
         elif isinstance(o, float):
             # see comment for int/float in _make_iterencode
             yield _floatstr(o)
+        elif _plans and o.__class__ in _plans:
+            yield from _iterencode_record(o, _current_indent_level)
         elif isinstance(o, (list, tuple)):
             yield from _iterencode_list(o, _current_indent_level)
-        elif isinstance(o, dict):
+        elif isinstance(o, (dict, Mapping)):
             yield from _iterencode_dict(o, _current_indent_level)
+        elif _is_container(o):
+            yield from _iterencode_list(o, _current_indent_level)
         else:
             if markers is not None:
                 marker_id = id(o)
@@ -396,8 +592,47 @@ def _make_iterencode(
             if markers is not None:
                 del markers[marker_id]
 
+    def _iterencode_record(o, _current_indent_level, can_be_orphan_pair=False, top_level=False):
+        # Encode an instance of a registered class as _iterencode_dict() would
+        # encode the dict of its fields
+        if markers is not None:
+            marker_id = id(o)
+            if marker_id in markers:
+                raise ValueError("Circular reference detected")
+            markers[marker_id] = o
+        names, get_values, keys = _plans[o.__class__]
+        values = get_values(o)
+        if _indent is not None or not keys:
+            yield from _iterencode_dict(dict(zip(names, values)), _current_indent_level, can_be_orphan_pair, top_level)
+            if markers is not None:
+                del markers[marker_id]
+            return
+        orphan_pair = can_be_orphan_pair and len(keys) == 1
+        buf = "" if orphan_pair or top_level else "("
+        separator = ""
+        for key, value in zip(keys, values):
+            encode = _scalar_encoders.get(value.__class__)
+            if encode is not None:
+                buf += separator + key + _key_separator + encode(value)
+            else:
+                if isinstance(value, (list, tuple, dict)) or value.__class__ in _plans or _is_container(value):
+                    yield buf + separator + key
+                else:
+                    yield buf + separator + key + _key_separator
+                buf = ""
+                yield from _iterencode(value, _current_indent_level)
+            separator = _item_separator
+        if not orphan_pair and not top_level:
+            buf += ")"
+        if buf:
+            yield buf
+        if markers is not None:
+            del markers[marker_id]
+
     def _top_level_iterencode(o, _current_indent_level):
-        if isinstance(o, dict):
+        if _plans and o.__class__ in _plans:
+            yield from _iterencode_record(o, _current_indent_level, top_level=True)
+        elif isinstance(o, (dict, Mapping)):
             yield from _iterencode_dict(o, _current_indent_level, top_level=True)
         else:
             yield from _iterencode(o, _current_indent_level)
@@ -3,6 +3,7 @@ from compactdata.char_constants import (
     _chars_to_escape_ascii,
     empty_string,
     infinity,
+    number_first_chars,
     number_regex,
     quotation_mark,
     quote_chars,
@@ -23,6 +24,54 @@ def escape_replacer(escape_char, chars_to_escape):
     return lambda s: chars_to_escape.sub(replace, s)
 
 
+_replacers = {}
+
+
+def get_escape_replacer(escape_char, chars_to_escape):
+    """Return the cached escape_replacer for escape_char and chars_to_escape."""
+    key = (escape_char, chars_to_escape)
+    try:
+        return _replacers[key]
+    except KeyError:
+        replacer = _replacers[key] = escape_replacer(escape_char, chars_to_escape)
+        return replacer
+
+
+def escaped_length(char, escape_char):
+    """Return the length of the escape sequence for char."""
+    if char in unescaped_to_escaped_map:
+        return len(escape_char) + len(unescaped_to_escaped_map[char])
+    return len(escape_char) + len(f"u{ord(char):04x}")
+
+
+def _shortest_encoding(s, escape_char, chars_to_escape, allow_unquoted):
+    # Unquoted strings need the most characters escaped, so one scan with the
+    # unquoted regex finds every character that needs escaping with any
+    # quote_char.  The escaped length for each quote_char is computed from
+    # those characters, and s is only escaped for the quote_char that gives
+    # the shortest result.  Ties go to the earlier quote_char in quote_chars.
+    escaped = chars_to_escape[empty_string].findall(s)
+    if not escaped:
+        if allow_unquoted:
+            return s
+        return quote_chars[0] + s + quote_chars[0]
+    best_length = infinity
+    best_quote_char = None
+    for quote_char in quote_chars:
+        if quote_char == empty_string and not allow_unquoted:
+            continue
+        length = len(s) + 2 * len(quote_char)
+        char_regex = chars_to_escape[quote_char]
+        for char in escaped:
+            if char_regex.match(char):
+                length += escaped_length(char, escape_char) - 1
+        if length < best_length:
+            best_length = length
+            best_quote_char = quote_char
+    s = get_escape_replacer(escape_char, chars_to_escape[best_quote_char])(s)
+    return best_quote_char + s + best_quote_char
+
+
 def encode_basestring(s, escape_char=None, quote_char=None, shortest=None, chars_to_escape=_chars_to_escape):
     if escape_char is None and quote_char is None and shortest is None:
         escape_char = reverse_solidus
@@ -35,7 +84,7 @@ def encode_basestring(s, escape_char=None, quote_char=None, shortest=None, chars
 
     leading_or_trailing_whitespace = s and (s[0] == " " or s[-1] == " ")
     # only_digits is true if whole string matches the regex number_regex
-    only_digits = s and number_regex.fullmatch(s)
+    only_digits = s and s[0] in number_first_chars and number_regex.fullmatch(s)
 
     if leading_or_trailing_whitespace and quote_char == empty_string:
         raise CompactDataEncodeError("Cannot encode string with leading or trailing whitespace as an unquoted string")
@@ -43,25 +92,11 @@ def encode_basestring(s, escape_char=None, quote_char=None, shortest=None, chars
         raise CompactDataEncodeError("Cannot encode string with only digits as an unquoted string")
 
     if shortest:
-        best_length = infinity
-        best_result = None
-        for quote_char in quote_chars:
-            if quote_char == empty_string and (leading_or_trailing_whitespace or only_digits):
-                continue
-            char_escape_map = chars_to_escape[quote_char]
-            replacer = escape_replacer(escape_char, char_escape_map)
-            result = replacer(s)
-
-            if quote_char:
-                result = quote_char + result + quote_char
-
-            if len(result) < best_length:
-                best_length = len(result)
-                best_result = result
-        return best_result
-
-    char_escape_map = chars_to_escape[quote_char]
-    replacer = escape_replacer(escape_char, char_escape_map)
+        return _shortest_encoding(
+            s, escape_char, chars_to_escape, not (leading_or_trailing_whitespace or only_digits)
+        )
+
+    replacer = get_escape_replacer(escape_char, chars_to_escape[quote_char])
     result = replacer(s)
 
     if quote_char:
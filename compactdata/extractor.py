@@ -0,0 +1,269 @@
+import re
+
+from compactdata.decode_context import default_context
+from compactdata.scanner import (
+    END,
+    EQUALS,
+    LBRACKET,
+    LPAREN,
+    RBRACKET,
+    RPAREN,
+    SEMICOLON,
+    _array_value_lookahead,
+    _pair_kinds,
+    _parse_array_value,
+    _parse_pair_value,
+    _parse_value,
+    _quote_chars,
+    _quoted_regexes,
+    _reserved_values,
+    _string_kinds,
+    _structural_regex,
+    next_token,
+    syntax_error,
+)
+from compactdata.unescapes import decode_string
+
+# A path is a sequence of map keys separated by dots, each optionally followed
+# by array subscripts: ``[*]`` for every element or ``[n]`` for one element,
+# e.g. ``salts[*].ids[0]``.
+_path_segment_regex = re.compile(r"([^.\[\]]*)((?:\[(?:\*|\d+)\])*)(?:\.|$)")
+_subscript_regex = re.compile(r"\[(\*|\d+)\]")
+
+_WILDCARD = "*"
+_WILDCARD_SUBSCRIPT = "[*]"
+
+
+class _PathNode:
+    __slots__ = ("children", "paths")
+
+    def __init__(self):
+        self.children = {}
+        # the paths that end at this node
+        self.paths = []
+
+
+def _parse_path(path):
+    steps = []
+    pos = 0
+    while pos < len(path):
+        m = _path_segment_regex.match(path, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"Invalid path: {path!r}")
+        key, subscripts = m.groups()
+        if key:
+            steps.append(key)
+        elif not subscripts:
+            raise ValueError(f"Invalid path: {path!r}")
+        for subscript in _subscript_regex.findall(subscripts):
+            steps.append(((subscript if subscript == _WILDCARD else int(subscript)),))
+        pos = m.end()
+    if not steps:
+        raise ValueError(f"Invalid path: {path!r}")
+    return steps
+
+
+def build_path_tree(paths):
+    root = _PathNode()
+    for path in paths:
+        node = root
+        for step in _parse_path(path):
+            node = node.children.setdefault(step, _PathNode())
+        node.paths.append(path)
+    return root
+
+
+def _record(node, obj, results):
+    for path in node.paths:
+        if _WILDCARD_SUBSCRIPT in path:
+            results.setdefault(path, []).append(obj)
+        else:
+            results[path] = obj
+    for step, child in node.children.items():
+        if isinstance(step, str):
+            if isinstance(obj, dict) and step in obj:
+                _record(child, obj[step], results)
+        elif isinstance(obj, list):
+            if step[0] == _WILDCARD:
+                for item in obj:
+                    _record(child, item, results)
+            elif step[0] < len(obj):
+                _record(child, obj[step[0]], results)
+
+
+def _init_results(node, results):
+    for path in node.paths:
+        if _WILDCARD_SUBSCRIPT in path:
+            results[path] = []
+    for child in node.children.values():
+        _init_results(child, results)
+
+
+def _skip_nested(s, pos):
+    # Return the position after the bracket that closes the one before pos,
+    # without tokenizing or unescaping anything in between
+    depth = 1
+    quote = None
+    search = _structural_regex.search
+    while True:
+        m = search(s, pos) if quote is None else _quoted_regexes[quote].search(s, pos)
+        if m is None:
+            raise syntax_error(END, None)
+        char = m.group()
+        pos = m.end()
+        if char == "\\" or char == "~":
+            pos += 1
+        elif quote is not None:
+            if char == quote:
+                quote = None
+        elif char == '"' or char == "`":
+            quote = char
+        elif char == "(" or char == "[":
+            depth += 1
+        elif char == ")" or char == "]":
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _skip_value(s, kind, value, pos):
+    if kind == LPAREN or kind == LBRACKET:
+        pos = _skip_nested(s, pos)
+    elif kind not in _string_kinds and kind not in _reserved_values:
+        raise syntax_error(kind, value)
+    return next_token(s, pos)
+
+
+def _skip_pair_value(s, kind, value, pos):
+    if kind == EQUALS:
+        kind, value, pos = next_token(s, pos)
+    return _skip_value(s, kind, value, pos)
+
+
+def _merge(results, found):
+    for key_results in found.values():
+        for path, value in key_results.items():
+            if _WILDCARD_SUBSCRIPT in path:
+                results.setdefault(path, []).extend(value)
+            else:
+                results[path] = value
+
+
+def _extract_pairs(s, kind, key, pos, node, results):
+    # Like dict(), only the last of several pairs with the same key counts, so
+    # the results for each key are collected separately and merged at the end
+    children = node.children
+    found = {}
+    while True:
+        if kind not in _string_kinds:
+            raise syntax_error(kind, key)
+        kind, value, pos = next_token(s, pos)
+        if kind not in _pair_kinds:
+            raise syntax_error(kind, value)
+        child = children.get(key)
+        if child is None:
+            kind, value, pos = _skip_pair_value(s, kind, value, pos)
+        else:
+            if kind == EQUALS:
+                kind, value, pos = next_token(s, pos)
+            found[key] = key_results = {}
+            kind, value, pos = _extract_value(s, kind, value, pos, child, key_results)
+        if kind != SEMICOLON:
+            _merge(results, found)
+            return kind, value, pos
+        kind, key, pos = next_token(s, pos)
+
+
+def _extract_array(s, pos, node, results):
+    every = node.children.get((_WILDCARD,))
+    index = 0
+    while True:
+        kind, value, pos = next_token(s, pos)
+        child = node.children.get((index,), every)
+        if child is not None and child is not every and every is not None:
+            # both [*] and [index] are requested
+            item, kind, value, pos = _parse_array_value(s, kind, value, pos, default_context)
+            _record(every, item, results)
+            _record(child, item, results)
+        elif child is not None:
+            kind, value, pos = _extract_array_value(s, kind, value, pos, child, results)
+        elif kind in _string_kinds:
+            kind, value, pos = next_token(s, pos)
+            if kind in _pair_kinds:
+                kind, value, pos = _skip_pair_value(s, kind, value, pos)
+            elif kind not in _array_value_lookahead:
+                raise syntax_error(kind, value)
+        else:
+            kind, value, pos = _skip_value(s, kind, value, pos)
+        index += 1
+        if kind == SEMICOLON:
+            continue
+        if kind != RBRACKET:
+            raise syntax_error(kind, value)
+        return next_token(s, pos)
+
+
+def _extract_array_value(s, kind, value, pos, node, results):
+    if kind in _string_kinds:
+        next_kind, next_value, next_pos = next_token(s, pos)
+        if next_kind in _pair_kinds:
+            # An orphan pair, which decodes to a map with a single key
+            if node.paths:
+                item, next_kind, next_value, next_pos = _parse_pair_value(
+                    s, next_kind, next_value, next_pos, default_context
+                )
+                _record(node, {value: item}, results)
+                return next_kind, next_value, next_pos
+            child = node.children.get(value)
+            if child is None:
+                return _skip_pair_value(s, next_kind, next_value, next_pos)
+            if next_kind == EQUALS:
+                next_kind, next_value, next_pos = next_token(s, next_pos)
+            return _extract_value(s, next_kind, next_value, next_pos, child, results)
+        if next_kind not in _array_value_lookahead:
+            raise syntax_error(next_kind, next_value)
+        if node.paths:
+            _record(node, decode_string(value, _quote_chars[kind]), results)
+        return next_kind, next_value, next_pos
+    return _extract_value(s, kind, value, pos, node, results)
+
+
+def _extract_value(s, kind, value, pos, node, results):
+    if node.paths:
+        item, kind, value, pos = _parse_value(s, kind, value, pos, default_context)
+        _record(node, item, results)
+        return kind, value, pos
+    if kind == LPAREN:
+        kind, key, pos = next_token(s, pos)
+        kind, value, pos = _extract_pairs(s, kind, key, pos, node, results)
+        if kind != RPAREN:
+            raise syntax_error(kind, value)
+        return next_token(s, pos)
+    if kind == LBRACKET:
+        return _extract_array(s, pos, node, results)
+    return _skip_value(s, kind, value, pos)
+
+
+def extract(s, root):
+    """Decode the values at the paths in the tree returned by build_path_tree().
+
+    Return a dict mapping each path that was found to its value, or for paths
+    with a ``[*]`` subscript to the list of values matching it.
+    """
+    results = {}
+    _init_results(root, results)
+    kind, value, pos = next_token(s, 0)
+    if kind in _string_kinds:
+        next_kind, next_value, next_pos = next_token(s, pos)
+        if next_kind in _pair_kinds:
+            # top level map
+            kind, value, pos = _extract_pairs(s, kind, value, pos, root, results)
+        elif next_kind in _array_value_lookahead:
+            kind, value, pos = next_kind, next_value, next_pos
+        else:
+            raise syntax_error(next_kind, next_value)
+    else:
+        kind, value, pos = _extract_value(s, kind, value, pos, root, results)
+    if kind != END:
+        raise syntax_error(kind, value)
+    return results
@@ -1,4 +1,13 @@
-from compactdata.unescapes import decode_string
+# The parser has a context attribute holding the DecodeContext of the string
+# being parsed.
+
+
+def _finish_map(p, pairs):
+    context = p.parser.context
+    # a list of pairs is kept as it is for object_pairs_hook
+    result = dict(pairs) if context.map_class is dict else pairs
+    return result if context.map_hook is None else context.map_hook(result)
+
 
 def p_compactdata(p):
     """compactdata : top_level_map
@@ -8,14 +17,18 @@ def p_compactdata(p):
 
 def p_top_level_map(p):
     """top_level_map : pair_list"""
-    p[0] = dict(p[1])
+    p[0] = _finish_map(p, p[1])
 
 
+# pair_list and value_list are left recursive so that each reduction appends
+# to the list in place, which keeps the parser stack at a constant depth and
+# builds the list in linear time.
 def p_pair_list(p):
-    """pair_list : pair SEMICOLON pair_list
+    """pair_list : pair_list SEMICOLON pair
     | pair"""
     if len(p) == 4:
-        p[0] = [p[1]] + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         p[0] = [p[1]]
 
@@ -32,19 +45,21 @@ def p_pair(p):
 
 def p_map(p):
     """map : LPAREN pair_list RPAREN"""
-    p[0] = dict(p[2])
+    p[0] = _finish_map(p, p[2])
 
 
 def p_array(p):
     """array : LBRACKET value_list RBRACKET"""
-    p[0] = p[2]
+    array_hook = p.parser.context.array_hook
+    p[0] = p[2] if array_hook is None else array_hook(p[2])
 
 
 def p_value_list(p):
-    """value_list : array_value SEMICOLON value_list
+    """value_list : value_list SEMICOLON array_value
     | array_value"""
     if len(p) == 4:
-        p[0] = [p[1]] + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         p[0] = [p[1]]
 
@@ -57,7 +72,7 @@ def p_array_value(p):
 
 def p_orphan_pair(p):
     """orphan_pair : pair"""
-    p[0] = dict([p[1]])
+    p[0] = _finish_map(p, [p[1]])
 
 
 def p_value(p):
@@ -84,24 +99,25 @@ def p_reserved(p):
 
 def p_unquoted_string(p):
     """unquoted_string : UNQUOTED_STRING"""
-    p[0] = decode_string(p[1], quote_char="")
+    p[0] = p.parser.context.decode_string(p[1], "")
 
 
 def p_quoted_string(p):
     """quoted_string : QUOTED_STRING"""
-    p[0] = decode_string(p[1], quote_char='"')
+    p[0] = p.parser.context.decode_string(p[1], '"')
 
 
 def p_grave_string(p):
     """grave_string : GRAVE_STRING"""
-    p[0] = decode_string(p[1], quote_char="`")
+    p[0] = p.parser.context.decode_string(p[1], "`")
 
 
 def p_key(p):
     """key : UNQUOTED_STRING
     | QUOTED_STRING
     | GRAVE_STRING"""
-    p[0] = p[1]
+    memo = p.parser.context.key_memo
+    p[0] = p[1] if memo is None else memo.setdefault(p[1], p[1])
 
 
 # Error handling rule
@@ -0,0 +1,174 @@
+from compactdata.exceptions import CompactDataDecodeError
+from compactdata.scanner import (
+    END,
+    RBRACKET,
+    RPAREN,
+    SEMICOLON,
+    _quoted_regexes,
+    _structural_regex,
+    next_token,
+    parse,
+    parse_array_value,
+    parse_pair,
+    syntax_error,
+)
+from compactdata.tokenizer import _ignore_regex
+
+_PAIRS = "pairs"
+_MAP = "map"
+_ARRAY = "array"
+
+# The tokens that may follow an element of each kind of top level container
+_terminators = {
+    _PAIRS: (SEMICOLON, END),
+    _MAP: (SEMICOLON, RPAREN),
+    _ARRAY: (SEMICOLON, RBRACKET),
+}
+
+
+class CompactDataIncrementalDecoder:
+    """Decode a CompactData document that arrives in chunks.
+
+    Only the top level element that is currently incomplete is kept in
+    memory.  Each call to ``feed()`` returns the top level elements that were
+    completed by the data passed to it:
+
+    - ``(key, value)`` tuples for the pairs of a top level map, whether it is
+      written as a bare pair list or in parentheses,
+    - the elements of a top level array,
+    - the value itself for any other document, which is only returned by
+      ``close()``.
+
+    ``close()`` must be called once all data has been fed.  Invalid input
+    raises ``CompactDataDecodeError`` as soon as the element that contains it
+    is complete.
+
+        >>> decoder = CompactDataIncrementalDecoder()
+        >>> decoder.feed("a=1;b=(c=")
+        [('a', 1)]
+        >>> decoder.feed("2)")
+        []
+        >>> decoder.close()
+        [('b', {'c': 2})]
+
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._start = 0
+        self._pos = 0
+        self._container = None
+        self._depth = 0
+        self._quote = None
+        self._closed = False
+        self._elements_found = 0
+
+    def feed(self, data: str) -> list:
+        self._buffer += data
+        try:
+            items = self._scan()
+        except Exception as e:
+            raise CompactDataDecodeError("Error decoding Compact Data string") from e
+        # Drop everything that has already been decoded
+        if self._start:
+            self._buffer = self._buffer[self._start :]
+            self._pos -= self._start
+            self._start = 0
+        return items
+
+    def close(self) -> list:
+        try:
+            items = self._scan()
+            items.extend(self._finish())
+        except Exception as e:
+            raise CompactDataDecodeError("Error decoding Compact Data string") from e
+        self._buffer = ""
+        self._start = self._pos = 0
+        return items
+
+    def _scan(self):
+        items = []
+        buffer = self._buffer
+        if self._container is None:
+            pos = _ignore_regex.match(buffer, 0).end()
+            if pos == len(buffer):
+                return items
+            if buffer[pos] == "[":
+                self._container = _ARRAY
+            elif buffer[pos] == "(":
+                self._container = _MAP
+            else:
+                self._container = _PAIRS
+            if self._container is not _PAIRS:
+                self._start = self._pos = pos + 1
+        if self._closed:
+            self._check_trailing()
+            return items
+        pos = self._pos
+        while True:
+            if self._quote is None:
+                m = _structural_regex.search(buffer, pos)
+            else:
+                m = _quoted_regexes[self._quote].search(buffer, pos)
+            if m is None:
+                self._pos = len(buffer)
+                return items
+            char = m.group()
+            pos = m.end()
+            if char == "\\" or char == "~":
+                if pos == len(buffer):
+                    # the escaped character hasn't arrived yet
+                    self._pos = pos - 1
+                    return items
+                pos += 1
+            elif self._quote is not None:
+                if char == self._quote:
+                    self._quote = None
+            elif char == '"' or char == "`":
+                self._quote = char
+            elif char == "(" or char == "[":
+                self._depth += 1
+            elif char == ")" or char == "]":
+                self._depth -= 1
+                if self._depth < 0:
+                    items.append(self._decode_element(buffer[self._start : pos]))
+                    self._start = self._pos = pos
+                    self._closed = True
+                    self._check_trailing()
+                    return items
+            elif self._depth == 0:
+                items.append(self._decode_element(buffer[self._start : pos]))
+                self._start = pos
+
+    def _decode_element(self, s):
+        if self._container is _ARRAY:
+            item, kind, value = parse_array_value(s)
+        else:
+            key, item, kind, value = parse_pair(s)
+            item = (key, item)
+        if kind not in _terminators[self._container]:
+            raise syntax_error(kind, value)
+        self._elements_found += 1
+        return item
+
+    def _check_trailing(self):
+        kind, value, _ = next_token(self._buffer, self._start)
+        if kind != END:
+            raise syntax_error(kind, value)
+
+    def _finish(self):
+        rest = self._buffer[self._start :]
+        if self._container is None:
+            # only whitespace has been fed
+            raise syntax_error(END, None)
+        if self._closed:
+            return []
+        if self._container is _PAIRS and not self._elements_found:
+            # A document with a single pair, or a single value. Documents that
+            # start with a parenthesis are _MAP containers, so a dict can only
+            # come from a pair here.
+            result = parse(rest)
+            if isinstance(result, dict):
+                return list(result.items())
+            return [result]
+        return [self._decode_element(rest)]
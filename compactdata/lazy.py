@@ -0,0 +1,84 @@
+from collections.abc import Mapping, Sequence
+
+from compactdata.exceptions import CompactDataDecodeError
+from compactdata.unescapes import decode_string
+
+# In lazy mode a scalar is kept as the (raw string, quote char) tuple of its
+# token.  Decoded values are never tuples, so the tuple class alone marks the
+# values that haven't been decoded yet.
+
+
+def raw_scalar(value, quote_char):
+    return value, quote_char
+
+
+def resolve(item):
+    if item.__class__ is tuple:
+        try:
+            return decode_string(*item)
+        except Exception as e:
+            raise CompactDataDecodeError("Error decoding Compact Data string") from e
+    return item
+
+
+class LazyMap(Mapping):
+    """A read-only map returned by ``loads(..., lazy=True)``.
+
+    Strings are unescaped and numbers converted the first time they are read,
+    so the values that are never read cost almost nothing to decode.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items):
+        self._items = items
+
+    def __getitem__(self, key):
+        item = self._items[key]
+        if item.__class__ is tuple:
+            item = self._items[key] = resolve(item)
+        return item
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"LazyMap({dict(self.items())!r})"
+
+
+class LazyList(Sequence):
+    """A read-only array returned by ``loads(..., lazy=True)``, which decodes
+    its elements the first time they are read.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items):
+        self._items = items
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if item.__class__ is tuple:
+            item = self._items[index] = resolve(item)
+        return item
+
+    def __len__(self):
+        return len(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"LazyList({list(self)!r})"
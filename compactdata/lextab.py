@@ -0,0 +1,10 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('EQUALS', 'FALSE', 'GRAVE_STRING', 'LBRACKET', 'LPAREN', 'NULL', 'QUOTED_STRING', 'RBRACKET', 'RPAREN', 'SEMICOLON', 'TRUE', 'UNQUOTED_STRING'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_GRAVE_STRING>`(?:[\\\\~][\\\\~`/bfnrt]|[\\\\~]u[0-9a-fA-F]{4}|[^\\\\`~])*`)|(?P<t_QUOTED_STRING>"(?:[\\\\~][\\\\~"/bfnrt]|[\\\\~]u[0-9a-fA-F]{4}|[^\\\\"~])*")|(?P<t_UNQUOTED_STRING>(?:[\\\\~][\\\\~`"/bfnrt\\[\\]\\(\\);=]|\\\\u[0-9a-fA-F]{4}|[^\\\\`"~\\[\\]\\(\\);=])+)|(?P<t_LPAREN>\\()|(?P<t_RPAREN>\\))|(?P<t_LBRACKET>\\[)|(?P<t_RBRACKET>\\])|(?P<t_EQUALS>=)|(?P<t_SEMICOLON>;)', [None, ('t_GRAVE_STRING', 'GRAVE_STRING'), ('t_QUOTED_STRING', 'QUOTED_STRING'), ('t_UNQUOTED_STRING', 'UNQUOTED_STRING'), (None, 'LPAREN'), (None, 'RPAREN'), (None, 'LBRACKET'), (None, 'RBRACKET'), (None, 'EQUALS'), (None, 'SEMICOLON')])]}
+_lexstateignore = {'INITIAL': ' \t\n'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
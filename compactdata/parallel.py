@@ -0,0 +1,249 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import compactdata
+from compactdata.exceptions import CompactDataDecodeError, CompactDataEncodeError
+from compactdata.scanner import (
+    _quoted_regexes,
+    _string_kinds,
+    _structural_regex,
+    next_token,
+)
+from compactdata.tokenizer import _ignore_regex
+
+# Decode and encode large batches of records on several processes.  The
+# records are split into chunks of chunksize records, and each chunk is handled
+# by compactdata.loads_many() or compactdata.dumps_many() in a worker process.
+# The options are pickled, so a default function or encoder class has to be
+# defined at module level.
+#
+# loads() splits a single document with a top level array, map or pair list
+# into slices at top level separators instead, and decodes each slice as a
+# document of the same kind.
+
+
+def _chunks(items, chunksize):
+    iterator = iter(items)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _run_chunk(function, error_class, message, chunk, start, return_exceptions, options):
+    results = function(chunk, return_exceptions=True, **options)
+    for index, result in enumerate(results):
+        if isinstance(result, error_class):
+            # Renumber the error with the index of the record in the batch.
+            # The cause isn't kept when the error is pickled, so its message
+            # is included.
+            error = error_class(f"{message} at index {start + index}: {result.__cause__}")
+            error.__cause__ = result.__cause__
+            if not return_exceptions:
+                raise error
+            results[index] = error
+    return results
+
+
+def _loads_chunk(chunk, start, return_exceptions, options):
+    return _run_chunk(
+        compactdata.loads_many,
+        CompactDataDecodeError,
+        "Error decoding Compact Data string",
+        chunk,
+        start,
+        return_exceptions,
+        options,
+    )
+
+
+def _dumps_chunk(chunk, start, return_exceptions, options):
+    return _run_chunk(
+        compactdata.dumps_many,
+        CompactDataEncodeError,
+        "Error encoding object",
+        chunk,
+        start,
+        return_exceptions,
+        options,
+    )
+
+
+def _map_chunks(function, items, workers, chunksize, return_exceptions, options):
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    results = []
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(function, chunk, start, return_exceptions, options)
+            for start, chunk in _chunks(items, chunksize)
+        ]
+        try:
+            for future in futures:
+                results.extend(future.result())
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return results
+
+
+def loads_many(
+    compactdata_strings,
+    workers: int = None,
+    chunksize: int = 1000,
+    *,
+    return_exceptions: bool = False,
+    **options,
+) -> list:
+    """Decode each of an iterable of CompactData strings in a pool of worker
+    processes, one per CPU unless workers is given.
+
+    The options are those of ``compactdata.loads()``.  If a string can't be
+    decoded, a CompactDataDecodeError giving its index is raised for the first
+    such string, unless return_exceptions is true, in which case the
+    exceptions are put in the list in place of the objects.
+    """
+    return _map_chunks(_loads_chunk, compactdata_strings, workers, chunksize, return_exceptions, options)
+
+
+def dumps_many(
+    objs,
+    workers: int = None,
+    chunksize: int = 1000,
+    *,
+    return_exceptions: bool = False,
+    **options,
+) -> list:
+    """Serialize each of an iterable of objects in a pool of worker
+    processes, one per CPU unless workers is given.
+
+    The options are those of ``compactdata.dumps()``.  Errors are reported as
+    by loads_many(), with CompactDataEncodeError.
+    """
+    return _map_chunks(_dumps_chunk, objs, workers, chunksize, return_exceptions, options)
+
+
+def _split(s, chunksize):
+    # Return the text before and after the elements of the top level container,
+    # and the slices of its elements, each ending before a top level separator
+    # about chunksize characters after the previous one.  Return None if s is
+    # not a well formed container.
+    start = _ignore_regex.match(s).end()
+    if start == len(s):
+        return None
+    if s[start] == "[" or s[start] == "(":
+        prefix = s[start]
+        start += 1
+    else:
+        prefix = ""
+    boundaries = [start]
+    next_split = start + chunksize
+    depth = 0
+    quote = None
+    search = _structural_regex.search
+    pos = start
+    while True:
+        m = search(s, pos) if quote is None else _quoted_regexes[quote].search(s, pos)
+        if m is None:
+            if prefix or quote is not None or depth:
+                return None
+            end = len(s)
+            break
+        char = m.group()
+        pos = m.end()
+        if char == "\\" or char == "~":
+            pos += 1
+        elif quote is not None:
+            if char == quote:
+                quote = None
+        elif char == '"' or char == "`":
+            quote = char
+        elif char == "(" or char == "[":
+            depth += 1
+        elif char == ")" or char == "]":
+            depth -= 1
+            if depth < 0:
+                if not prefix or _ignore_regex.match(s, pos).end() != len(s):
+                    return None
+                end = pos - 1
+                break
+        elif depth == 0 and pos >= next_split:
+            boundaries.append(pos)
+            next_split = pos + chunksize
+    slices = [s[boundary : boundaries[i + 1] - 1] for i, boundary in enumerate(boundaries[:-1])]
+    slices.append(s[boundaries[-1] : end])
+    return prefix, s[end : end + 1] if prefix else "", slices
+
+
+# The options of loads() that build the top level map, which can't be split
+_map_options = ("object_hook", "object_pairs_hook", "into")
+
+
+def _loads_slice(compactdata_string, options):
+    return compactdata.loads(compactdata_string, **options)
+
+
+def loads(compactdata_string, workers: int = None, chunksize: int = 1 << 20, **options):
+    """Decode a single large CompactData string, or UTF-8 encoded bytes, in a
+    pool of worker processes, one per CPU unless workers is given.
+
+    A document with a top level array, map or pair list is split at the top
+    level separators into slices of about chunksize characters, which are
+    decoded in parallel and joined into a single list or dict.  Any other
+    document, or one that is too short to split, is decoded by
+    ``compactdata.loads()`` in this process, as is a map or pair list when
+    object_hook, object_pairs_hook or into is given, since the hook or class
+    has to be called with the whole map.
+
+    The options are those of ``compactdata.loads()``, except lazy.  If the
+    string can't be decoded, the error is the one raised by
+    ``compactdata.loads()``.
+    """
+    if options.get("lazy"):
+        raise ValueError("lazy decoding is not supported by parallel.loads()")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if not isinstance(compactdata_string, str):
+        # the slices are found in the decoded string
+        try:
+            compactdata_string = str(compactdata_string, "utf-8")
+        except UnicodeDecodeError:
+            return compactdata.loads(compactdata_string, **options)
+    split = _split(compactdata_string, chunksize)
+    if split is None or len(split[2]) == 1:
+        return compactdata.loads(compactdata_string, **options)
+    prefix, suffix, slices = split
+    if prefix != "[" and any(options.get(name) is not None for name in _map_options):
+        # the hooks and into have to see the whole top level map
+        return compactdata.loads(compactdata_string, **options)
+    if not prefix:
+        # Each slice of a pair list must start with a key, otherwise it could
+        # decode to a map on its own
+        try:
+            kinds = [next_token(piece, 0)[0] for piece in slices]
+        except CompactDataDecodeError:
+            kinds = None
+        if kinds is None or any(kind not in _string_kinds for kind in kinds):
+            return compactdata.loads(compactdata_string, **options)
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_loads_slice, prefix + piece + suffix, options) for piece in slices]
+        try:
+            results = [future.result() for future in futures]
+        except CompactDataDecodeError:
+            for future in futures:
+                future.cancel()
+            results = None
+    if results is None or (prefix != "[" and not all(isinstance(result, dict) for result in results)):
+        # decode the whole string to raise the same error as loads()
+        return compactdata.loads(compactdata_string, **options)
+    if prefix == "[":
+        return [item for result in results for item in result]
+    merged = results[0]
+    for result in results[1:]:
+        # later pairs replace earlier ones with the same key, as in dict()
+        merged.update(result)
+    return merged
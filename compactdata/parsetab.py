@@ -0,0 +1,60 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'EQUALS FALSE GRAVE_STRING LBRACKET LPAREN NULL QUOTED_STRING RBRACKET RPAREN SEMICOLON TRUE UNQUOTED_STRINGcompactdata : top_level_map\n    | valuetop_level_map : pair_listpair_list : pair_list SEMICOLON pair\n    | pairpair : key EQUALS value\n    | key map\n    | key arraymap : LPAREN pair_list RPARENarray : LBRACKET value_list RBRACKETvalue_list : value_list SEMICOLON array_value\n    | array_valuearray_value : orphan_pair\n    | valueorphan_pair : pairvalue : quoted_string\n    | grave_string\n    | unquoted_string\n    | reserved\n    | map\n    | arrayreserved : NULL\n    | TRUE\n    | FALSEunquoted_string : UNQUOTED_STRINGquoted_string : QUOTED_STRINGgrave_string : GRAVE_STRINGkey : UNQUOTED_STRING\n    | QUOTED_STRING\n    | GRAVE_STRING'
+    
+_lr_action_items = {'QUOTED_STRING':([0,18,19,21,31,37,],[12,24,12,24,39,12,]),'GRAVE_STRING':([0,18,19,21,31,37,],[13,25,13,25,40,13,]),'UNQUOTED_STRING':([0,18,19,21,31,37,],[14,23,14,23,41,14,]),'NULL':([0,19,31,37,],[15,15,15,15,]),'TRUE':([0,19,31,37,],[16,16,16,16,]),'FALSE':([0,19,31,37,],[17,17,17,17,]),'LPAREN':([0,12,13,14,19,20,23,24,25,31,37,],[18,-29,-30,-28,18,18,-28,-29,-30,18,18,]),'LBRACKET':([0,12,13,14,19,20,23,24,25,31,37,],[19,-29,-30,-28,19,19,-28,-29,-30,19,19,]),'$end':([1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,32,33,34,35,36,38,39,40,41,],[0,-1,-2,-3,-16,-17,-18,-19,-20,-21,-5,-26,-27,-25,-22,-23,-24,-7,-8,-4,-9,-10,-6,-26,-27,-25,]),'SEMICOLON':([4,5,6,7,8,9,10,11,12,13,14,15,16,17,22,26,27,28,29,30,32,33,34,35,36,38,39,40,41,42,],[21,-16,-17,-18,-19,-20,-21,-5,-26,-27,-25,-22,-23,-24,21,37,-12,-13,-14,-15,-7,-8,-4,-9,-10,-6,-26,-27,-25,-11,]),'RBRACKET':([5,6,7,8,9,10,12,13,14,15,16,17,26,27,28,29,30,32,33,35,36,38,39,40,41,42,],[-16,-17,-18,-19,-20,-21,-26,-27,-25,-22,-23,-24,36,-12,-13,-14,-15,-7,-8,-9,-10,-6,-26,-27,-25,-11,]),'RPAREN':([5,6,7,8,9,10,11,15,16,17,22,32,33,34,35,36,38,39,40,41,],[-16,-17,-18,-19,-20,-21,-5,-22,-23,-24,35,-7,-8,-4,-9,-10,-6,-26,-27,-25,]),'EQUALS':([12,13,14,20,23,24,25,],[-29,-30,-28,31,-28,-29,-30,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'compactdata':([0,],[1,]),'top_level_map':([0,],[2,]),'value':([0,19,31,37,],[3,29,38,29,]),'pair_list':([0,18,],[4,22,]),'quoted_string':([0,19,31,37,],[5,5,5,5,]),'grave_string':([0,19,31,37,],[6,6,6,6,]),'unquoted_string':([0,19,31,37,],[7,7,7,7,]),'reserved':([0,19,31,37,],[8,8,8,8,]),'map':([0,19,20,31,37,],[9,9,32,9,9,]),'array':([0,19,20,31,37,],[10,10,33,10,10,]),'pair':([0,18,19,21,37,],[11,11,30,34,30,]),'key':([0,18,19,21,37,],[20,20,20,20,20,]),'value_list':([19,],[26,]),'array_value':([19,37,],[27,42,]),'orphan_pair':([19,37,],[28,28,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> compactdata","S'",1,None,None,None),
+  ('compactdata -> top_level_map','compactdata',1,'p_compactdata','grammar_rules.py',4),
+  ('compactdata -> value','compactdata',1,'p_compactdata','grammar_rules.py',5),
+  ('top_level_map -> pair_list','top_level_map',1,'p_top_level_map','grammar_rules.py',10),
+  ('pair_list -> pair_list SEMICOLON pair','pair_list',3,'p_pair_list','grammar_rules.py',18),
+  ('pair_list -> pair','pair_list',1,'p_pair_list','grammar_rules.py',19),
+  ('pair -> key EQUALS value','pair',3,'p_pair','grammar_rules.py',28),
+  ('pair -> key map','pair',2,'p_pair','grammar_rules.py',29),
+  ('pair -> key array','pair',2,'p_pair','grammar_rules.py',30),
+  ('map -> LPAREN pair_list RPAREN','map',3,'p_map','grammar_rules.py',38),
+  ('array -> LBRACKET value_list RBRACKET','array',3,'p_array','grammar_rules.py',43),
+  ('value_list -> value_list SEMICOLON array_value','value_list',3,'p_value_list','grammar_rules.py',48),
+  ('value_list -> array_value','value_list',1,'p_value_list','grammar_rules.py',49),
+  ('array_value -> orphan_pair','array_value',1,'p_array_value','grammar_rules.py',58),
+  ('array_value -> value','array_value',1,'p_array_value','grammar_rules.py',59),
+  ('orphan_pair -> pair','orphan_pair',1,'p_orphan_pair','grammar_rules.py',64),
+  ('value -> quoted_string','value',1,'p_value','grammar_rules.py',69),
+  ('value -> grave_string','value',1,'p_value','grammar_rules.py',70),
+  ('value -> unquoted_string','value',1,'p_value','grammar_rules.py',71),
+  ('value -> reserved','value',1,'p_value','grammar_rules.py',72),
+  ('value -> map','value',1,'p_value','grammar_rules.py',73),
+  ('value -> array','value',1,'p_value','grammar_rules.py',74),
+  ('reserved -> NULL','reserved',1,'p_reserved','grammar_rules.py',79),
+  ('reserved -> TRUE','reserved',1,'p_reserved','grammar_rules.py',80),
+  ('reserved -> FALSE','reserved',1,'p_reserved','grammar_rules.py',81),
+  ('unquoted_string -> UNQUOTED_STRING','unquoted_string',1,'p_unquoted_string','grammar_rules.py',91),
+  ('quoted_string -> QUOTED_STRING','quoted_string',1,'p_quoted_string','grammar_rules.py',96),
+  ('grave_string -> GRAVE_STRING','grave_string',1,'p_grave_string','grammar_rules.py',101),
+  ('key -> UNQUOTED_STRING','key',1,'p_key','grammar_rules.py',106),
+  ('key -> QUOTED_STRING','key',1,'p_key','grammar_rules.py',107),
+  ('key -> GRAVE_STRING','key',1,'p_key','grammar_rules.py',108),
+]
@@ -0,0 +1,499 @@
+import re
+
+from compactdata.decode_context import default_context
+from compactdata.tokenizer import (
+    END,
+    EQUALS,
+    GRAVE_STRING,
+    LBRACKET,
+    LPAREN,
+    QUOTED_STRING,
+    RBRACKET,
+    RPAREN,
+    SEMICOLON,
+    UNQUOTED_STRING,
+    next_token,
+    syntax_error,
+)
+from compactdata.unescapes import decode_string
+
+# A hand-written parser for the grammar in grammar_rules.py.  It reuses the
+# token regexes from token_definitions.py so that it accepts exactly the same
+# language as the PLY backend, including maps and arrays nested deeper than
+# the recursion limit, and it reports errors at the same token.
+
+# Characters that change the nesting depth or quoting state, or that separate
+# elements.  The escape characters are included so that the character after
+# them can be skipped.
+_structural_regex = re.compile(r"[\\~\"`()\[\];]")
+_quoted_regexes = {
+    '"': re.compile(r'[\\~"]'),
+    "`": re.compile(r"[\\~`]"),
+}
+
+_string_kinds = (UNQUOTED_STRING, QUOTED_STRING, GRAVE_STRING)
+_pair_kinds = (EQUALS, LPAREN, LBRACKET)
+_quote_chars = {UNQUOTED_STRING: "", QUOTED_STRING: '"', GRAVE_STRING: "`"}
+_reserved_values = {"NULL": None, "TRUE": True, "FALSE": False}
+
+# PLY reads the lookahead token before reducing a string, and only reduces it
+# (which unescapes it) when the lookahead is in the LALR lookahead set of the
+# state.  Checking the same sets keeps the error reported for invalid input
+# identical between the two backends.
+_value_lookahead = (SEMICOLON, RPAREN, RBRACKET, END)
+_array_value_lookahead = (SEMICOLON, RBRACKET, END)
+
+
+# Each of the _parse_* functions takes the first token of what it parses, and
+# returns the parsed object followed by the token after it.  The context is a
+# DecodeContext, which decides how keys and scalars are turned into objects.
+
+
+def _parse_string(s, kind, value, pos, lookahead, context):
+    next_kind, next_value, next_pos = context.next_token(s, pos)
+    if next_kind not in lookahead:
+        raise syntax_error(next_kind, next_value)
+    return context.decode_string(value, _quote_chars[kind]), next_kind, next_value, next_pos
+
+
+def _parse_scalar(s, kind, value, pos, context):
+    if kind in _quote_chars:
+        return _parse_string(s, kind, value, pos, _value_lookahead, context)
+    if kind in _reserved_values:
+        next_kind, next_value, next_pos = context.next_token(s, pos)
+        return _reserved_values[kind], next_kind, next_value, next_pos
+    raise syntax_error(kind, value)
+
+
+def _parse_value(s, kind, value, pos, context):
+    if kind == LPAREN or kind == LBRACKET:
+        return _parse_nested(s, kind, pos, context)
+    return _parse_scalar(s, kind, value, pos, context)
+
+
+def _parse_pair_value(s, kind, value, pos, context):
+    # The key has been consumed and kind is one of _pair_kinds
+    if kind == EQUALS:
+        kind, value, pos = context.next_token(s, pos)
+        return _parse_value(s, kind, value, pos, context)
+    return _parse_nested(s, kind, pos, context)
+
+
+def _parse_pairs(s, result, kind, key, pos, context):
+    # Parses a top level pair_list into result, kind is the token type of the
+    # first key
+    memo = context.key_memo
+    next_token = context.next_token
+    fields = context.field_contexts
+    value_context = context
+    while True:
+        if kind not in _string_kinds:
+            raise syntax_error(kind, key)
+        kind, value, pos = next_token(s, pos)
+        if kind not in _pair_kinds:
+            raise syntax_error(kind, value)
+        if memo is not None:
+            key = memo.setdefault(key, key)
+        if fields is not None:
+            value_context = fields.get(key, context.base_context)
+        result[key], kind, value, pos = _parse_pair_value(s, kind, value, pos, value_context)
+        if kind != SEMICOLON:
+            return kind, value, pos
+        kind, key, pos = next_token(s, pos)
+
+
+# The containers on the stack of _parse_nested() and _iter_nested().  An orphan
+# pair in an array is a map with a single key.
+_MAP = "map"
+_ARRAY = "array"
+_ORPHAN = "orphan"
+
+
+def _parse_nested(s, kind, pos, context):
+    # Parses the map or array opened by kind, which has been consumed.  Unlike
+    # the other _parse_* functions, the maps and arrays nested in it are
+    # parsed with a stack of (container, result, context, key) for those that
+    # are still open rather than by recursion, so that as with the PLY grammar
+    # the depth of nesting isn't limited by the Python stack.
+    next_token = context.next_token
+    stack = []
+    key = None
+    while True:
+        if kind == LPAREN:
+            container = _MAP
+            result = context.map_class()
+        else:
+            container = _ARRAY
+            result = []
+        kind, value, pos = next_token(s, pos)
+        while True:
+            # Parse elements until the closing bracket, with kind its token,
+            # or a nested map or array, with kind its opening bracket
+            value_context = context
+            if container is _MAP:
+                memo = context.key_memo
+                fields = context.field_contexts
+                while True:
+                    if kind not in _string_kinds:
+                        raise syntax_error(kind, value)
+                    key = value
+                    kind, value, pos = next_token(s, pos)
+                    if kind not in _pair_kinds:
+                        raise syntax_error(kind, value)
+                    if memo is not None:
+                        key = memo.setdefault(key, key)
+                    if fields is not None:
+                        value_context = fields.get(key, context.base_context)
+                    if kind == EQUALS:
+                        kind, value, pos = next_token(s, pos)
+                    if kind == LPAREN or kind == LBRACKET:
+                        break
+                    result[key], kind, value, pos = _parse_scalar(s, kind, value, pos, value_context)
+                    if kind != SEMICOLON:
+                        if kind != RPAREN:
+                            raise syntax_error(kind, value)
+                        break
+                    kind, value, pos = next_token(s, pos)
+            else:
+                append = result.append
+                while True:
+                    if kind in _string_kinds:
+                        next_kind, next_value, next_pos = next_token(s, pos)
+                        if next_kind in _pair_kinds:
+                            # orphan pair
+                            key = value
+                            if context.key_memo is not None:
+                                key = context.key_memo.setdefault(key, key)
+                            if context.field_contexts is not None:
+                                value_context = context.field_contexts.get(key, context.base_context)
+                            kind, value, pos = next_kind, next_value, next_pos
+                            if kind == EQUALS:
+                                kind, value, pos = next_token(s, pos)
+                            if kind == LPAREN or kind == LBRACKET:
+                                stack.append((container, result, context, None))
+                                container = _ORPHAN
+                                result = context.map_class()
+                                break
+                            item, kind, value, pos = _parse_scalar(s, kind, value, pos, value_context)
+                            value_context = context
+                            pairs = context.map_class()
+                            pairs[key] = item
+                            item = pairs
+                            if context.map_hook is not None:
+                                item = context.map_hook(item)
+                            append(item)
+                        else:
+                            if next_kind not in _array_value_lookahead:
+                                raise syntax_error(next_kind, next_value)
+                            append(context.decode_string(value, _quote_chars[kind]))
+                            kind, value, pos = next_kind, next_value, next_pos
+                    elif kind == LPAREN or kind == LBRACKET:
+                        break
+                    else:
+                        item, kind, value, pos = _parse_scalar(s, kind, value, pos, context)
+                        append(item)
+                    if kind == SEMICOLON:
+                        kind, value, pos = next_token(s, pos)
+                        continue
+                    if kind != RBRACKET:
+                        raise syntax_error(kind, value)
+                    break
+            if kind == LPAREN or kind == LBRACKET:
+                stack.append((container, result, context, key))
+                context = value_context
+                break
+            # Close containers until one has more elements
+            while True:
+                if container is _ARRAY:
+                    if context.array_hook is not None:
+                        result = context.array_hook(result)
+                    kind, value, pos = next_token(s, pos)
+                else:
+                    if context.map_hook is not None:
+                        result = context.map_hook(result)
+                    if container is _MAP:
+                        kind, value, pos = next_token(s, pos)
+                if not stack:
+                    return result, kind, value, pos
+                item = result
+                container, result, context, key = stack.pop()
+                if container is _ARRAY:
+                    result.append(item)
+                    if kind == SEMICOLON:
+                        break
+                    if kind != RBRACKET:
+                        raise syntax_error(kind, value)
+                else:
+                    result[key] = item
+                    if container is _MAP:
+                        if kind == SEMICOLON:
+                            break
+                        if kind != RPAREN:
+                            raise syntax_error(kind, value)
+            kind, value, pos = next_token(s, pos)
+
+
+def _parse_array_value(s, kind, value, pos, context):
+    if kind in _string_kinds:
+        next_kind, next_value, next_pos = context.next_token(s, pos)
+        if next_kind in _pair_kinds:
+            # orphan pair
+            if context.key_memo is not None:
+                value = context.key_memo.setdefault(value, value)
+            value_context = context
+            if context.field_contexts is not None:
+                value_context = context.field_contexts.get(value, context.base_context)
+            item, next_kind, next_value, next_pos = _parse_pair_value(
+                s, next_kind, next_value, next_pos, value_context
+            )
+            pairs = context.map_class()
+            pairs[value] = item
+            item = pairs
+            if context.map_hook is not None:
+                item = context.map_hook(item)
+            return item, next_kind, next_value, next_pos
+        if next_kind not in _array_value_lookahead:
+            raise syntax_error(next_kind, next_value)
+        return context.decode_string(value, _quote_chars[kind]), next_kind, next_value, next_pos
+    return _parse_value(s, kind, value, pos, context)
+
+
+def parse_pair(s, context=default_context):
+    """Parse the pair at the start of s.
+
+    Return the key, the value, and the kind and value of the token after it.
+    """
+    kind, key, pos = context.next_token(s, 0)
+    if kind not in _string_kinds:
+        raise syntax_error(kind, key)
+    kind, value, pos = context.next_token(s, pos)
+    if kind not in _pair_kinds:
+        raise syntax_error(kind, value)
+    if context.key_memo is not None:
+        key = context.key_memo.setdefault(key, key)
+    value, kind, next_value, pos = _parse_pair_value(s, kind, value, pos, context)
+    return key, value, kind, next_value
+
+
+def parse_array_value(s, context=default_context):
+    """Parse the array element at the start of s.
+
+    Return the element, and the kind and value of the token after it.
+    """
+    kind, value, pos = context.next_token(s, 0)
+    value, kind, next_value, pos = _parse_array_value(s, kind, value, pos, context)
+    return value, kind, next_value
+
+
+def parse(s, context=default_context):
+    """Parse a CompactData string without going through the PLY lexer and parser."""
+    kind, value, pos = context.next_token(s, 0)
+    if kind in _string_kinds:
+        next_kind, next_value, next_pos = context.next_token(s, pos)
+        if next_kind in _pair_kinds:
+            # top level map, the first key has already been consumed
+            result = context.map_class()
+            kind, value, pos = _parse_pairs(s, result, kind, value, pos, context)
+            if context.map_hook is not None:
+                result = context.map_hook(result)
+        elif next_kind in _array_value_lookahead:
+            result = context.decode_string(value, _quote_chars[kind])
+            kind, value, pos = next_kind, next_value, next_pos
+        else:
+            raise syntax_error(next_kind, next_value)
+    else:
+        result, kind, value, pos = _parse_value(s, kind, value, pos, context)
+    if kind != END:
+        raise syntax_error(kind, value)
+    return result
+
+
+# Events yielded by iterparse()
+START_MAP = "start_map"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+KEY = "key"
+VALUE = "value"
+
+# The _iter_* generators mirror the _parse_* functions, yielding events instead
+# of building objects and returning the token after what they parsed.
+
+
+def _iter_value(s, kind, value, pos):
+    if kind in _quote_chars:
+        item, kind, value, pos = _parse_string(s, kind, value, pos, _value_lookahead, default_context)
+        yield VALUE, item
+        return kind, value, pos
+    if kind in _reserved_values:
+        yield VALUE, _reserved_values[kind]
+        return next_token(s, pos)
+    if kind == LPAREN or kind == LBRACKET:
+        return (yield from _iter_nested(s, kind, pos))
+    raise syntax_error(kind, value)
+
+
+def _iter_pair_value(s, kind, value, pos):
+    if kind == EQUALS:
+        kind, value, pos = next_token(s, pos)
+    return (yield from _iter_value(s, kind, value, pos))
+
+
+def _iter_pairs(s, kind, key, pos):
+    while True:
+        if kind not in _string_kinds:
+            raise syntax_error(kind, key)
+        kind, value, pos = next_token(s, pos)
+        if kind not in _pair_kinds:
+            raise syntax_error(kind, value)
+        yield KEY, key
+        kind, value, pos = yield from _iter_pair_value(s, kind, value, pos)
+        if kind != SEMICOLON:
+            return kind, value, pos
+        kind, key, pos = next_token(s, pos)
+
+
+def _iter_nested(s, kind, pos):
+    # Like _parse_nested(), with a stack of the containers that are still open
+    stack = []
+    while True:
+        if kind == LPAREN:
+            container = _MAP
+            yield START_MAP, None
+        else:
+            container = _ARRAY
+            yield START_ARRAY, None
+        kind, value, pos = next_token(s, pos)
+        while True:
+            if container is _MAP:
+                while True:
+                    if kind not in _string_kinds:
+                        raise syntax_error(kind, value)
+                    key = value
+                    kind, value, pos = next_token(s, pos)
+                    if kind not in _pair_kinds:
+                        raise syntax_error(kind, value)
+                    yield KEY, key
+                    if kind == EQUALS:
+                        kind, value, pos = next_token(s, pos)
+                    if kind == LPAREN or kind == LBRACKET:
+                        break
+                    if kind in _reserved_values:
+                        yield VALUE, _reserved_values[kind]
+                        kind, value, pos = next_token(s, pos)
+                    else:
+                        item, kind, value, pos = _parse_scalar(s, kind, value, pos, default_context)
+                        yield VALUE, item
+                    if kind != SEMICOLON:
+                        if kind != RPAREN:
+                            raise syntax_error(kind, value)
+                        break
+                    kind, value, pos = next_token(s, pos)
+            else:
+                while True:
+                    if kind in _string_kinds:
+                        next_kind, next_value, next_pos = next_token(s, pos)
+                        if next_kind in _pair_kinds:
+                            # orphan pair
+                            yield START_MAP, None
+                            yield KEY, value
+                            kind, value, pos = next_kind, next_value, next_pos
+                            if kind == EQUALS:
+                                kind, value, pos = next_token(s, pos)
+                            if kind == LPAREN or kind == LBRACKET:
+                                stack.append(container)
+                                container = _ORPHAN
+                                break
+                            if kind in _reserved_values:
+                                yield VALUE, _reserved_values[kind]
+                                kind, value, pos = next_token(s, pos)
+                            else:
+                                item, kind, value, pos = _parse_scalar(s, kind, value, pos, default_context)
+                                yield VALUE, item
+                            yield END_MAP, None
+                        else:
+                            if next_kind not in _array_value_lookahead:
+                                raise syntax_error(next_kind, next_value)
+                            yield VALUE, decode_string(value, _quote_chars[kind])
+                            kind, value, pos = next_kind, next_value, next_pos
+                    elif kind == LPAREN or kind == LBRACKET:
+                        break
+                    elif kind in _reserved_values:
+                        yield VALUE, _reserved_values[kind]
+                        kind, value, pos = next_token(s, pos)
+                    else:
+                        item, kind, value, pos = _parse_scalar(s, kind, value, pos, default_context)
+                        yield VALUE, item
+                    if kind == SEMICOLON:
+                        kind, value, pos = next_token(s, pos)
+                        continue
+                    if kind != RBRACKET:
+                        raise syntax_error(kind, value)
+                    break
+            if kind == LPAREN or kind == LBRACKET:
+                stack.append(container)
+                break
+            while True:
+                if container is _ARRAY:
+                    yield END_ARRAY, None
+                    kind, value, pos = next_token(s, pos)
+                else:
+                    yield END_MAP, None
+                    if container is _MAP:
+                        kind, value, pos = next_token(s, pos)
+                if not stack:
+                    return kind, value, pos
+                container = stack.pop()
+                if container is _ARRAY:
+                    if kind == SEMICOLON:
+                        break
+                    if kind != RBRACKET:
+                        raise syntax_error(kind, value)
+                elif container is _MAP:
+                    if kind == SEMICOLON:
+                        break
+                    if kind != RPAREN:
+                        raise syntax_error(kind, value)
+            kind, value, pos = next_token(s, pos)
+
+
+def _iter_array_value(s, kind, value, pos):
+    if kind in _string_kinds:
+        next_kind, next_value, next_pos = next_token(s, pos)
+        if next_kind in _pair_kinds:
+            # orphan pair
+            yield START_MAP, None
+            yield KEY, value
+            next_kind, next_value, next_pos = yield from _iter_pair_value(s, next_kind, next_value, next_pos)
+            yield END_MAP, None
+            return next_kind, next_value, next_pos
+        if next_kind not in _array_value_lookahead:
+            raise syntax_error(next_kind, next_value)
+        yield VALUE, decode_string(value, _quote_chars[kind])
+        return next_kind, next_value, next_pos
+    return (yield from _iter_value(s, kind, value, pos))
+
+
+def iterparse(s):
+    """Yield (event, value) tuples for a CompactData string.
+
+    The events are ``start_map``, ``key``, ``value``, ``end_map``,
+    ``start_array`` and ``end_array``.  Only ``key`` and ``value`` events have
+    a value, which is None for the others.  A top level pair list is reported
+    as a map.
+    """
+    kind, value, pos = next_token(s, 0)
+    if kind in _string_kinds:
+        next_kind, next_value, next_pos = next_token(s, pos)
+        if next_kind in _pair_kinds:
+            yield START_MAP, None
+            kind, value, pos = yield from _iter_pairs(s, kind, value, pos)
+            if kind != END:
+                raise syntax_error(kind, value)
+            yield END_MAP, None
+            return
+        kind, value, pos = yield from _iter_array_value(s, kind, value, pos)
+    else:
+        kind, value, pos = yield from _iter_value(s, kind, value, pos)
+    if kind != END:
+        raise syntax_error(kind, value)
@@ -0,0 +1,133 @@
+import dataclasses
+import functools
+import typing
+from collections.abc import MutableSequence, Sequence
+from decimal import Decimal
+
+from compactdata.decode_context import DecodeContext, default_binary_context, default_context
+from compactdata.unescapes import unescape_string
+
+# Decoding into typed objects with loads(..., into=cls).  A class is compiled
+# into a DecodeContext whose map_hook builds an instance from the dict of its
+# fields, and whose field_contexts give the context for the value of each
+# field, so that nested records, lists of records and scalars are converted
+# while the document is parsed rather than in a second pass over the result.
+
+try:
+    from types import UnionType
+
+    _union_types = (typing.Union, UnionType)
+except ImportError:
+    _union_types = (typing.Union,)
+
+_list_types = (list, Sequence, MutableSequence)
+
+# Scalar types built from the unescaped text of the token, so that e.g. a
+# Decimal keeps all of its digits
+_scalar_types = (int, float, Decimal)
+
+
+def _is_record(cls):
+    if not isinstance(cls, type) or issubclass(cls, (str, tuple)) or cls in _scalar_types:
+        return False
+    return dataclasses.is_dataclass(cls) or any("__slots__" in vars(base) for base in cls.__mro__[:-1])
+
+
+def _dataclass_builder(cls):
+    names = frozenset(field.name for field in dataclasses.fields(cls) if field.init)
+
+    def build(result):
+        if result.keys() <= names:
+            return cls(**result)
+        # keys that aren't fields are ignored
+        return cls(**{key: value for key, value in result.items() if key in names})
+
+    return build, names
+
+
+def _slots_builder(cls):
+    names = set()
+    for base in cls.__mro__[:-1]:
+        slots = vars(base).get("__slots__", ())
+        names.update((slots,) if isinstance(slots, str) else slots)
+    names = frozenset(names - {"__dict__", "__weakref__"})
+    new = cls.__new__
+
+    def build(result):
+        # __init__ isn't called, fields that aren't in the map are left unset
+        obj = new(cls)
+        for key, value in result.items():
+            if key in names:
+                setattr(obj, key, value)
+        return obj
+
+    return build, names
+
+
+def _derive(base):
+    context = DecodeContext()
+    context.key_memo = base.key_memo
+    context.next_token = base.next_token
+    context.decode_string = base.decode_string
+    context.base_context = base
+    return context
+
+
+def _scalar_decoder(cls):
+    def decode(value, quote_char):
+        return cls(unescape_string(value, quote_char))
+
+    return decode
+
+
+def _type_context(hint, base, compiled):
+    # Return the context for values of the type hint
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+    if origin in _union_types:
+        args = [arg for arg in args if arg is not type(None)]
+        if len(args) != 1:
+            return base
+        return _type_context(args[0], base, compiled)
+    if origin in _list_types:
+        # the elements of an array are decoded with the context of the array
+        return _type_context(args[0], base, compiled) if args else base
+    if hint is str or hint in _scalar_types:
+        context = _derive(base)
+        context.decode_string = unescape_string if hint is str else _scalar_decoder(hint)
+        return context
+    if _is_record(hint):
+        return _record_context(hint, base, compiled)
+    return base
+
+
+def _record_context(cls, base, compiled):
+    context = compiled.get(cls)
+    if context is not None:
+        return context
+    if dataclasses.is_dataclass(cls):
+        build, names = _dataclass_builder(cls)
+    else:
+        build, names = _slots_builder(cls)
+    context = compiled[cls] = _derive(base)
+    context.map_hook = build
+    hints = typing.get_type_hints(cls)
+    context.field_contexts = {name: _type_context(hints.get(name), base, compiled) for name in names}
+    return context
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_record_context(cls, base):
+    return _record_context(cls, base, {})
+
+
+def record_context(cls, base):
+    """Return the DecodeContext decoding maps to instances of cls, which is a
+    dataclass or a class with ``__slots__``, with the options of base.
+    """
+    if not _is_record(cls):
+        raise TypeError(f"{cls.__name__} is not a dataclass or a class with __slots__")
+    if base is default_context or base is default_binary_context:
+        # the contexts of other options hold memos, which aren't kept alive
+        return _cached_record_context(cls, base)
+    return _record_context(cls, base, {})
@@ -0,0 +1,96 @@
+import re
+
+from compactdata.exceptions import CompactDataDecodeError
+from compactdata.token_definitions import (
+    reserved,
+    t_GRAVE_STRING,
+    t_ignore,
+    t_QUOTED_STRING,
+    t_UNQUOTED_STRING,
+)
+
+# The tokens of the PLY lexer in token_definitions.py, for the scanner.
+
+GRAVE_STRING = "GRAVE_STRING"
+QUOTED_STRING = "QUOTED_STRING"
+UNQUOTED_STRING = "UNQUOTED_STRING"
+LPAREN = "LPAREN"
+RPAREN = "RPAREN"
+LBRACKET = "LBRACKET"
+RBRACKET = "RBRACKET"
+EQUALS = "EQUALS"
+SEMICOLON = "SEMICOLON"
+END = "$end"
+
+_punctuation = {
+    "(": LPAREN,
+    ")": RPAREN,
+    "[": LBRACKET,
+    "]": RBRACKET,
+    "=": EQUALS,
+    ";": SEMICOLON,
+}
+
+# The negative lookahead stops the unquoted string pattern from matching
+# ignored characters that should have been skipped.
+_token_regex = re.compile(
+    f"[{re.escape(t_ignore)}]*(?![{re.escape(t_ignore)}])(?:"
+    f"({t_GRAVE_STRING.__doc__})"
+    f"|({t_QUOTED_STRING.__doc__})"
+    f"|({t_UNQUOTED_STRING.__doc__})"
+    r"|([()\[\]=;]))"
+)
+_ignore_regex = re.compile(f"[{re.escape(t_ignore)}]*")
+
+# The same patterns for UTF-8 encoded input.  They only contain ASCII
+# characters, and no byte of a multi-byte UTF-8 character is ASCII, so they
+# find the same tokens in the bytes as in the decoded string.
+_token_regex_bytes = re.compile(_token_regex.pattern.encode())
+_ignore_regex_bytes = re.compile(_ignore_regex.pattern.encode())
+
+
+def next_token(s, pos, _match=_token_regex.match):
+    """Return the (kind, value, end) of the token starting at or after pos."""
+    m = _match(s, pos)
+    if m is None:
+        pos = _ignore_regex.match(s, pos).end()
+        if pos == len(s):
+            return END, None, pos
+        raise CompactDataDecodeError(f"Invalid character: {s[pos]}")
+    end = m.end()
+    group = m.lastindex
+    if group == 3:
+        value = m.group(3)
+        return reserved.get(value, UNQUOTED_STRING), value, end
+    if group == 4:
+        return _punctuation[m.group(4)], m.group(4), end
+    if group == 2:
+        return QUOTED_STRING, s[m.start(2) + 1 : end - 1], end
+    return GRAVE_STRING, s[m.start(1) + 1 : end - 1], end
+
+
+def next_token_bytes(s, pos, _match=_token_regex_bytes.match):
+    """Return the token starting at or after pos in a UTF-8 encoded bytes-like
+    object, like next_token(), decoding only the value of that token.
+    """
+    m = _match(s, pos)
+    if m is None:
+        pos = _ignore_regex_bytes.match(s, pos).end()
+        if pos == len(s):
+            return END, None, pos
+        raise CompactDataDecodeError(f"Invalid character: {chr(s[pos])}")
+    end = m.end()
+    group = m.lastindex
+    if group == 3:
+        value = str(m.group(3), "utf-8")
+        return reserved.get(value, UNQUOTED_STRING), value, end
+    if group == 4:
+        value = chr(s[end - 1])
+        return _punctuation[value], value, end
+    return (QUOTED_STRING if group == 2 else GRAVE_STRING), str(m.group(group)[1:-1], "utf-8"), end
+
+
+def syntax_error(kind, value):
+    if kind == END:
+        return CompactDataDecodeError("Syntax error at EOF")
+    return CompactDataDecodeError(f"Syntax error at token {kind} ({value})")
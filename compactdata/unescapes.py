@@ -2,7 +2,8 @@ from compactdata.char_constants import (
     _chars_to_unescape,
     all_escaped_chars_regex,
     escaped_to_unescaped_map,
-    number_regex,
+    float_parts_regex,
+    number_first_chars,
 )
 from compactdata.exceptions import CompactDataDecodeError
 
@@ -22,18 +23,57 @@ def unescape_replace(chars_to_unescape):
     return replace
 
 
-def decode_string(s, quote_char):
-    replacer = unescape_replace(_chars_to_unescape[quote_char])
-    unescaped_string = all_escaped_chars_regex.sub(replacer, s)
+_replacers = {quote_char: unescape_replace(regex) for quote_char, regex in _chars_to_unescape.items()}
 
-    # Check if the string matches the number definition
-    match = number_regex.fullmatch(unescaped_string)
 
-    if match:
-        number = match.group(1)
-        if "." in number or "e" in number.lower():
-            return float(number)
-        else:
-            return int(number)
+def decode_string(s, quote_char):
+    if "\\" in s or "~" in s:
+        unescaped_string = all_escaped_chars_regex.sub(_replacers[quote_char], s)
     else:
+        # nothing to unescape
+        unescaped_string = s
+
+    # Check if the string matches the number definition
+    if not unescaped_string or unescaped_string[0] not in number_first_chars:
         return unescaped_string
+    match = float_parts_regex.fullmatch(unescaped_string)
+    if match is None:
+        return unescaped_string
+    if match.lastindex:
+        return float(unescaped_string)
+    return int(unescaped_string)
+
+
+def unescape_string(s, quote_char):
+    # decode_string() without converting numbers, for fields typed as str
+    if "\\" in s or "~" in s:
+        return all_escaped_chars_regex.sub(_replacers[quote_char], s)
+    return s
+
+
+_constants = ("Infinity", "-Infinity", "NaN")
+
+
+def make_string_decoder(parse_int=None, parse_float=None, parse_constant=None):
+    # Return a decode_string() that converts numbers with parse_int and
+    # parse_float, and unquoted Infinity, -Infinity and NaN with
+    # parse_constant, each called with the text of the token
+    if parse_int is None:
+        parse_int = int
+    if parse_float is None:
+        parse_float = float
+
+    def decode(s, quote_char):
+        if parse_constant is not None and not quote_char and s in _constants:
+            return parse_constant(s)
+        unescaped_string = unescape_string(s, quote_char)
+        if not unescaped_string or unescaped_string[0] not in number_first_chars:
+            return unescaped_string
+        match = float_parts_regex.fullmatch(unescaped_string)
+        if match is None:
+            return unescaped_string
+        if match.lastindex:
+            return parse_float(unescaped_string)
+        return parse_int(unescaped_string)
+
+    return decode
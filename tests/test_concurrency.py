@@ -0,0 +1,54 @@
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import compactdata
+
+# Decodes the same records from many threads at once and checks every result
+# against the single threaded output, for both engines.
+
+WORKERS = 32
+ROUNDS = 20
+
+RECORDS = [
+    f"@dv=1;salts=[(s=host{i}.example.com;ids=[342c208d-0523-4d22-b7dd-{i:012d};`x y`]);"
+    f'(s="q;{i}";ids=[{i};{i}.5;true;null])];n={i}'
+    for i in range(200)
+] + [
+    f"[{i};(k=v{i});a=[1;2];`z`]" for i in range(100)
+]
+
+
+class ConcurrentDecodingTest(unittest.TestCase):
+    def setUp(self):
+        # switch threads often, so that they are interrupted in the middle of
+        # a decode
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def check_engine(self, engine):
+        expected = [compactdata.loads(record, engine=engine) for record in RECORDS]
+        tasks = [(index, record) for _ in range(ROUNDS) for index, record in enumerate(RECORDS)]
+
+        def decode(task):
+            index, record = task
+            return index, compactdata.loads(record, engine=engine)
+
+        with ThreadPoolExecutor(WORKERS) as executor:
+            results = list(executor.map(decode, tasks))
+        self.assertEqual(len(results), len(tasks))
+        for index, result in results:
+            self.assertEqual(result, expected[index], RECORDS[index])
+
+    def test_ply(self):
+        self.check_engine("ply")
+
+    def test_scanner(self):
+        self.check_engine("scanner")
+
+
+if __name__ == "__main__":
+    unittest.main()
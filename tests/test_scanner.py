@@ -0,0 +1,164 @@
+import random
+import unittest
+
+import compactdata
+
+# Checks that the scanner engine returns the same results and raises the same
+# errors as the PLY engine, which is the reference implementation of the
+# grammar.
+
+DOCUMENTS = [
+    "my_object=(string=`abc`;number=1;array=[1;2;3];map=(a=1;b=2;c=3))",
+    "[1;2;3]",
+    "a=1;b=2.5;c=10e3",
+    "@dv=1;salts=[(s=salts.domainverification.org;ids=[342c208d-0523-4d22-b7dd-32952dbeace2])]",
+    '[a=1;b=(c=2);"q;"=[x];`g`(k=v);null;true;false;-0;01]',
+    "a=[(b=[(c=[1;d=2])])];e=null",
+    ' a = " x\\"y" ; b = `z~`` ',
+    "single",
+    "true",
+    "(a=1)",
+    "a(b=1)",
+    "a[1;2]",
+    # invalid documents
+    "",
+    "[]",
+    "()",
+    "a=",
+    "a=[1;2",
+    'a="x',
+    "a=1)",
+    "a=1;",
+    "(a=true(b=1))",
+    "[1;2)",
+    "(a=1]",
+    "[a=1)",
+    "a=1 b=2",
+    "=1",
+    "[1;2]]",
+    "\x01",
+]
+
+SEEDS = range(5)
+RANDOM_DOCUMENTS = 500
+
+# deeper than the recursion limit, which a recursive parser can't decode
+DEPTHS = (400, 1000, 5000)
+
+
+def random_document(rng, depth=0):
+    r = rng.random()
+    if depth > 4 or r < 0.4:
+        return rng.choice(["a", "1", '"q;"', "`g`", "null", "true", "1.5e3", "a\\;b", '"x~"y"', "-0", " s ", "01"])
+    if r < 0.7:
+        return (
+            "["
+            + ";".join(
+                random_document(rng, depth + 1) if rng.random() < 0.7 else "k=" + random_document(rng, depth + 1)
+                for _ in range(rng.randint(1, 4))
+            )
+            + "]"
+        )
+    return (
+        "("
+        + ";".join(
+            rng.choice(["k", '"k"', "k2", "`z`"]) + rng.choice(["=", ""]) + random_document(rng, depth + 1)
+            for _ in range(rng.randint(1, 4))
+        )
+        + ")"
+    )
+
+
+def decode(s, **options):
+    try:
+        return "ok", compactdata.loads(s, **options)
+    except compactdata.CompactDataDecodeError as e:
+        return "error", str(e.__cause__)
+
+
+def build(events):
+    # The object described by the events of iterparse(), built without
+    # recursion
+    stack = [[]]
+    keys = [None]
+    for event, value in events:
+        if event == "start_map" or event == "start_array":
+            stack.append({} if event == "start_map" else [])
+            keys.append(None)
+        elif event == "key":
+            keys[-1] = value
+        else:
+            if event == "end_map" or event == "end_array":
+                value = stack.pop()
+                keys.pop()
+            if isinstance(stack[-1], dict):
+                stack[-1][keys[-1]] = value
+            else:
+                stack[-1].append(value)
+    return stack[0][0]
+
+
+def unwrap(obj):
+    # Return the number of maps and arrays around the first scalar in obj, and
+    # the scalar.  Nested objects this deep can't be compared with ==.
+    depth = 0
+    while isinstance(obj, (dict, list)):
+        obj = obj[0] if isinstance(obj, list) else next(iter(obj.values()))
+        depth += 1
+    return depth, obj
+
+
+class ScannerTest(unittest.TestCase):
+    def check(self, s):
+        expected = decode(s, engine="ply")
+        self.assertEqual(decode(s, engine="scanner"), expected, s)
+        self.assertEqual(decode(s.encode(), engine="scanner"), expected, s)
+        self.assertEqual(
+            decode(s, engine="scanner", object_pairs_hook=list), decode(s, engine="ply", object_pairs_hook=list), s
+        )
+        try:
+            result = "ok", build(compactdata.iterparse(s))
+        except compactdata.CompactDataDecodeError as e:
+            result = "error", str(e.__cause__)
+        self.assertEqual(result, expected, s)
+
+    def test_documents(self):
+        for s in DOCUMENTS:
+            self.check(s)
+
+    def test_random_documents(self):
+        for seed in SEEDS:
+            rng = random.Random(seed)
+            for _ in range(RANDOM_DOCUMENTS):
+                s = random_document(rng)
+                if rng.random() < 0.3:
+                    # usually invalid
+                    pos = rng.randint(0, len(s))
+                    s = s[:pos] + rng.choice("=;()[]\"`\\ a1") + s[rng.randint(pos, len(s)) :]
+                self.check(s)
+
+    def test_deep_nesting(self):
+        for depth in DEPTHS:
+            for s, levels in (
+                ("a=" + "[" * depth + "1" + "]" * depth, depth + 1),
+                ("(a=" * depth + "1" + ")" * depth, depth),
+                ("[a=" * depth + "1" + "]" * depth, 2 * depth),
+            ):
+                expected = unwrap(compactdata.loads(s, engine="ply"))
+                self.assertEqual(expected, (levels, 1))
+                self.assertEqual(unwrap(compactdata.loads(s)), expected)
+                self.assertEqual(unwrap(compactdata.loads(s.encode(), object_pairs_hook=dict)), expected)
+                self.assertEqual(unwrap(build(compactdata.iterparse(s))), expected)
+                path = "[0]" if s.startswith("[") else "a"
+                self.assertEqual(unwrap(compactdata.extract(s, paths=[path])[path]), (levels - 1, 1))
+                decoder = compactdata.CompactDataIncrementalDecoder()
+                items = decoder.feed(s[: len(s) // 2]) + decoder.feed(s[len(s) // 2 :]) + decoder.close()
+                self.assertEqual(len(items), 1)
+                self.assertEqual(unwrap(items[0] if s.startswith("[") else items[0][1]), (levels - 1, 1))
+
+            s = "a=" + "[" * depth + "1" + "]" * (depth - 1)
+            self.assertEqual(decode(s), decode(s, engine="ply"))
+
+
+if __name__ == "__main__":
+    unittest.main()